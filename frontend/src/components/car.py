@@ -1,27 +1,712 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, g, request, jsonify
 from flask_cors import CORS
+from werkzeug.serving import make_server
 import pandas as pd
 import numpy as np
 from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.metrics.pairwise import cosine_similarity
-from sklearn.preprocessing import StandardScaler, LabelEncoder
+from sklearn.decomposition import TruncatedSVD
+from sklearn.preprocessing import StandardScaler, LabelEncoder, normalize
+import scipy.sparse as sp
+from scipy.spatial import cKDTree
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+import argparse
+import atexit
+import bisect
+import copy
+import gc
+import hashlib
+import hmac
+import json
+import multiprocessing
+import queue
 import re
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import threading
+import time
+import unicodedata
 import warnings
 import os
+try:
+    import fcntl
+except ImportError:  # Not available on Windows, where artifact writes aren't locked
+    fcntl = None
+try:
+    import resource
+except ImportError:  # Not available on Windows
+    resource = None
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Only needed for Parquet/Arrow job corpora
+    pa = pq = None
+try:
+    import orjson
+except ImportError:  # Faster JSON encoding of responses; the json module is the fallback
+    orjson = None
 warnings.filterwarnings('ignore')
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
 
+# Bump whenever the on-disk model artifact layout or feature extraction changes
+ARTIFACT_VERSION = 12
+
+# Content scoring engines: sparse TF-IDF cosine, or dense LSA (truncated SVD)
+CONTENT_ENGINES = ('tfidf', 'lsa')
+# Dimensionality of the LSA job embeddings
+LSA_COMPONENTS = 128
+
+# Fewest candidates worth scoring before falling back to location/category matches
+MIN_CANDIDATES = 10
+# Fewest matches in the user's location shard before the other shards are scored
+MIN_LOCAL_CANDIDATES = 20
+
+# Bundled gazetteer of Indian cities and districts with coordinates
+GAZETTEER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'india_cities.csv')
+EARTH_RADIUS_KM = 6371.0
+# Jobs this close (km) to the user count as being in the user's location
+NEARBY_KM = 25
+# Places this close (km) to a major city belong to its location cluster
+METRO_RADIUS_KM = 60
+
+# Bundled table of skill and job words in the Indic languages of the resume
+# builder (res.py), in native script and romanized, with their English terms
+INDIC_TERMS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'indic_terms.csv')
+INDIC_LANGUAGES = ['hindi', 'marathi', 'gujarati', 'bengali', 'tamil', 'telugu', 'kannada']
+# Character n-gram similarity a word of the job titles and skills needs to stand
+# in for a regional-language word; below it, shared suffixes such as 'ing '
+# decide the match, making e.g. nursing look like billing
+REGIONAL_MIN_SIMILARITY = 0.5
+
+# Cascade ranking of a single profile: candidate retrieval, then cheap
+# categorical and constraint scores prune to prefilter_size jobs, then content
+# similarity runs on those and the weighted blend keeps top_k. Deployments
+# override any of these with --pipeline-config.
+DEFAULT_PIPELINE = {
+    'prefilter_size': 5000,
+    'top_k': 10,
+    'weights': {'content': 0.4, 'collaborative': 0.3, 'constraint': 0.3}
+}
+# Upper bounds of the per-stage candidate count histogram buckets
+CANDIDATE_BUCKETS = (0, 10, 100, 1000, 5000, 10000, 50000, 100000, 500000, 1000000, 10000000)
+
+# Job features a request can hard-filter on, and the largest number of jobs
+# left by its filters that is scored directly instead of via candidate generation
+FILTER_FEATURES = ('work_type', 'experience_level', 'skill_category', 'location_cluster', 'job_type')
+MAX_DIRECT_FILTERED_JOBS = 10000
+
+# Rows read from the job CSV at a time
+CSV_CHUNK_ROWS = 50000
+
+# Columnar job corpus formats by file extension. Corpora written by
+# export_corpus() are already normalized, which their schema metadata records.
+COLUMNAR_FORMATS = {'.arrow': 'arrow', '.feather': 'arrow', '.ipc': 'arrow', '.parquet': 'parquet'}
+NORMALIZED_CORPUS_KEY = b'sarthisetu.normalized_corpus'
+# Columns of a normalized corpus
+CORPUS_COLUMNS = ['job_title', 'location', 'skills', 'combined_text']
+
+# JSON (array) or JSONL dumps of the jobs collection (server/models/job.model.js),
+# whose structured fields replace the features otherwise mined from job text
+JOB_EXPORT_FORMATS = {'.json': 'json', '.jsonl': 'jsonl'}
+JOB_TYPES = ['full-time', 'part-time', 'contract', 'internship', 'freelance']
+# Job categories that determine the skill category; others are mined from text
+JOB_CATEGORY_SKILLS = {'technology': 'technical', 'design': 'creative', 'marketing': 'creative',
+                       'sales': 'communication', 'finance': 'analytical'}
+# Constraint keywords answered by a structured field: keyword -> (column, values)
+STRUCTURED_CONSTRAINTS = {
+    'remote': ('work_type', ['remote']), 'work_from_home': ('work_type', ['remote']),
+    'onsite': ('work_type', ['onsite']),
+    'full_time': ('job_type', ['full-time']), 'part_time': ('job_type', ['part-time'])
+}
+# Numeric job attributes of job exports
+JOB_ATTRIBUTES = ['salary_min', 'salary_max', 'experience_min', 'experience_max']
+# Range filters: filter name -> (attribute holding the low end, attribute holding the high end)
+RANGE_FILTERS = {'salary': ('salary_min', 'salary_max')}
+
+# Job change file: how often the serving model picks up new lines, and when
+# the changes are compacted into a rebuilt artifact (with refreshed IDF):
+# once they amount to this fraction of the corpus, or the artifact is this old
+CHANGE_POLL_SECONDS = 1.0
+COMPACT_FRACTION = 0.05
+COMPACT_INTERVAL = 3600
+COMPACT_RETRY_SECONDS = 60
+# Environment variable holding the bearer token POST/DELETE /api/jobs require;
+# when it isn't set, jobs only change through the change file
+JOBS_TOKEN_ENV = 'CAR_JOBS_TOKEN'
+
+# Documents per keyword-matching task, and the corpus size above which
+# matching is spread over a process pool
+MATCH_CHUNK_SIZE = 20000
+PARALLEL_MATCH_MIN_DOCS = 100000
+
+# Largest number of profiles accepted by one batch recommendation request
+MAX_BATCH_PROFILES = 10000
+# Largest top_k a batch recommendation request may ask for
+MAX_BATCH_TOP_K = 100
+
+# Scored shortlists kept per model, and how long (seconds) each stays valid
+SCORE_CACHE_SIZE = 10000
+SCORE_CACHE_TTL = 600
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.0001, 0.00025, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05,
+                   0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 300.0, 600.0)
+
+class _Histogram:
+    """Fixed-bucket latency histogram; cheap to update, summarized only when scraped"""
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+        self.lock = threading.Lock()
+    
+    def observe(self, value):
+        idx = bisect.bisect_left(self.buckets, value)
+        with self.lock:
+            self.counts[idx] += 1
+            self.sum += value
+            self.count += 1
+    
+    def quantile(self, q):
+        """Estimate a quantile by interpolating within its bucket"""
+        if self.count == 0:
+            return 0.0
+        rank = q * self.count
+        cumulative = 0
+        for idx, count in enumerate(self.counts):
+            if cumulative + count >= rank and count:
+                if idx == len(self.buckets):
+                    return self.buckets[-1]
+                lower = self.buckets[idx - 1] if idx else 0.0
+                return lower + (self.buckets[idx] - lower) * (rank - cumulative) / count
+            cumulative += count
+        return self.buckets[-1]
+    
+    def render(self, name, labels):
+        """Prometheus text exposition lines for this histogram"""
+        lines = []
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), self.counts):
+            cumulative += count
+            lines.append(f'{name}_bucket{{{labels},le="{bound}"}} {cumulative}')
+        lines.append(f'{name}_sum{{{labels}}} {self.sum}')
+        lines.append(f'{name}_count{{{labels}}} {self.count}')
+        return lines
+
+def _dumps(value):
+    """Compact UTF-8 JSON bytes, encoded with orjson when it is installed"""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+def _json_response(*parts):
+    """A JSON response whose body is the concatenation of already serialized parts"""
+    return Response(b''.join(parts), mimetype='application/json')
+
+def _peak_rss_mb():
+    """Peak resident set size of this process so far, in MB (None if unknown)"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in kilobytes elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == 'darwin' else 1024), 1)
+
+def _file_stamp(path):
+    """[size, modification time] of a file, None if it doesn't exist"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return [stat.st_size, stat.st_mtime_ns]
+
+def _match_keywords(texts, keywords):
+    """Boolean (texts x keywords) matrix of substring hits"""
+    hits = np.zeros((len(texts), len(keywords)), dtype=bool)
+    for col, keyword in enumerate(keywords):
+        hits[:, col] = [keyword in text for text in texts]
+    return hits
+
+class _ScoreCache:
+    """Bounded LRU cache of scored shortlists with a TTL, tied to one model version.
+    
+    Entries are only valid for the model that scored them: a lookup or store
+    under a different version empties the cache first.
+    """
+    def __init__(self, max_entries=SCORE_CACHE_SIZE, ttl=SCORE_CACHE_TTL):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+        self.version = None
+        self.lock = threading.Lock()
+        self.stats = Counter()
+    
+    def _check_version(self, version):
+        if version != self.version:
+            if self.entries:
+                self.stats['invalidations'] += 1
+            self.entries.clear()
+            self.version = version
+    
+    def get(self, version, key):
+        with self.lock:
+            self._check_version(version)
+            entry = self.entries.get(key)
+            if entry is not None and time.monotonic() - entry[0] > self.ttl:
+                del self.entries[key]
+                self.stats['expired'] += 1
+                entry = None
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            self.entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return entry[1]
+    
+    def put(self, version, key, value):
+        with self.lock:
+            self._check_version(version)
+            self.entries[key] = (time.monotonic(), value)
+            self.entries.move_to_end(key)
+            while len(self.entries) > self.max_entries:
+                self.entries.popitem(last=False)
+                self.stats['evictions'] += 1
+    
+    def __len__(self):
+        return len(self.entries)
+
+def load_pipeline_config(path=None, overrides=None):
+    """Ranking pipeline settings: the defaults, updated from a JSON file and/or a dict"""
+    pipeline = dict(DEFAULT_PIPELINE, weights=dict(DEFAULT_PIPELINE['weights']))
+    updates = {}
+    if path:
+        with open(path) as f:
+            updates.update(json.load(f))
+    updates.update(overrides or {})
+    
+    for key, value in updates.items():
+        if key not in pipeline:
+            raise ValueError(f"Unknown pipeline setting: {key}")
+        if key == 'weights':
+            unknown = set(value) - set(pipeline['weights'])
+            if unknown:
+                raise ValueError(f"Unknown pipeline weights: {', '.join(sorted(unknown))}")
+            pipeline['weights'].update({name: float(weight) for name, weight in value.items()})
+        elif int(value) < 1:
+            raise ValueError(f"Pipeline setting {key} must be at least 1")
+        else:
+            pipeline[key] = int(value)
+    return pipeline
+
+def _canonical_column_names(columns):
+    """Map raw job corpus column names to the names used internally"""
+    # Handle different possible column name variations
+    column_mapping = {
+        'job_descri': 'job_description',
+        'job_title': 'job_title',
+        'location': 'location',
+        'skills': 'skills'
+    }
+    names = {}
+    for column in columns:
+        name = str(column).strip().lower().replace(' ', '_')
+        names[column] = column_mapping.get(name, name)
+    return names
+
+def _mongo_number(value):
+    """A number from a jobs export, unwrapping extended JSON such as {"$numberInt": "5"}"""
+    if isinstance(value, dict):
+        value = next(iter(value.values()), None)
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+def _document_id(job):
+    """The id of a job document, unwrapping extended JSON such as {"$oid": "..."}"""
+    value = job.get('_id', job.get('id'))
+    if isinstance(value, dict):
+        value = next(iter(value.values()), None)
+    return None if value is None else str(value)
+
+def _job_document_error(job):
+    """Why a job document can't be read as a job, or None if it can"""
+    if not isinstance(job, dict):
+        return 'Job must be a JSON object'
+    for field in ('title', 'location', 'description', 'workMode', 'jobType', 'category'):
+        if job.get(field) is not None and not isinstance(job[field], str):
+            return f'{field} must be a string'
+    for field in ('skills', 'requirements', 'tags'):
+        values = job.get(field)
+        if values is not None and not (isinstance(values, list) and all(isinstance(v, str) for v in values)):
+            return f'{field} must be a list of strings'
+    for field in ('salary', 'experience'):
+        if job.get(field) is not None and not isinstance(job[field], dict):
+            return f'{field} must be an object'
+    return None
+
+def _latest_job_documents(jobs):
+    """The last readable document of each job id, in order of first appearance"""
+    latest = {}
+    for job in jobs:
+        job_id = _document_id(job) if isinstance(job, dict) else None
+        if job_id is None:
+            continue
+        error = _job_document_error(job)
+        if error:
+            print(f"Warning: skipping job change for {job_id}: {error}")
+            continue
+        latest[job_id] = job
+    return latest
+
+def _haversine_km(origin, coords):
+    """Great-circle distance in km from one (lat, lon) point to each row of coords"""
+    lat1, lon1 = np.radians(origin)
+    lat2, lon2 = np.radians(coords[..., 0]), np.radians(coords[..., 1])
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lon2 - lon1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(a))
+
+def _unit_vectors(coords):
+    """(lat, lon) rows as points on the unit sphere, where chord length tracks distance"""
+    lat, lon = np.radians(coords[:, 0]), np.radians(coords[:, 1])
+    return np.column_stack([np.cos(lat) * np.cos(lon), np.cos(lat) * np.sin(lon), np.sin(lat)])
+
+def _chord_length(km):
+    """Straight-line distance on the unit sphere between points km apart on the surface"""
+    return 2 * np.sin(km / (2 * EARTH_RADIUS_KM))
+
+class _Gazetteer:
+    """Offline lookup of Indian places, by name or alias, to (latitude, longitude)"""
+    def __init__(self, path=GAZETTEER_PATH):
+        self.coords = {}
+        self.digest = None
+        if not os.path.exists(path):
+            print(f"Warning: gazetteer {path} not found; matching locations by name only")
+            return
+        
+        with open(path, 'rb') as f:
+            self.digest = hashlib.sha256(f.read()).hexdigest()
+        places = pd.read_csv(path, dtype=str, keep_default_na=False)
+        for place in places.itertuples(index=False):
+            coords = (float(place.latitude), float(place.longitude))
+            for name in [place.name] + place.aliases.split('|'):
+                key = ' '.join(self._words(name))
+                if key:
+                    self.coords.setdefault(key, coords)
+        self.max_words = max(len(key.split()) for key in self.coords)
+    
+    @staticmethod
+    def _words(text):
+        return re.sub(r'[^a-z0-9]+', ' ', str(text).lower()).split()
+    
+    def geocode(self, text):
+        """Coordinates of the longest place name in the text (the first on ties), or None"""
+        if not self.coords:
+            return None
+        words = self._words(text)
+        for n in range(min(self.max_words, len(words)), 0, -1):
+            for i in range(len(words) - n + 1):
+                coords = self.coords.get(' '.join(words[i:i + n]))
+                if coords is not None:
+                    return coords
+        return None
+
+# Brahmic scripts from Devanagari (U+0900) to Malayalam (U+0D7F) share one
+# Unicode layout, so a letter's offset within its block identifies its sound
+_BRAHMIC_RE = re.compile('[\u0900-\u0d7f]')
+_INDIC_WORD_RE = re.compile('[\\w\u0900-\u0d7f]+')
+_BRAHMIC_VOWELS = dict(zip(range(0x05, 0x15), 'a a i i u u ri li e e e ai o o o au'.split()))
+_BRAHMIC_CONSONANTS = dict(zip(range(0x15, 0x3A), ('k kh g gh n ch chh j jh n t th d dh n t th d dh n n '
+                                                   'p ph b bh m y r r l l zh v sh sh s h').split()))
+_BRAHMIC_CONSONANTS.update(zip(range(0x58, 0x60), 'q kh g z r rh f y'.split()))
+_BRAHMIC_VOWEL_SIGNS = dict(zip(range(0x3E, 0x4D), 'a i i u u ri ri e e e ai o o o au'.split()))
+_BRAHMIC_SIGNS = {0x01: 'n', 0x02: 'n', 0x03: 'h', 0x4E: 't', **{0x66 + d: str(d) for d in range(10)}}
+_BRAHMIC_VIRAMA = 0x4D
+# Latin spellings of one sound folded together, so that English and
+# transliterated spellings of a word share character n-grams
+_SPELLING_FOLDS = [(re.compile(pattern), replacement) for pattern, replacement in
+                   [('ph', 'f'), ('vh', 'v'), ('c(?!h)', 'k'), ('q', 'k'), ('x', 'ks'), ('w', 'v'), ('z', 'j'),
+                    (r'([a-z])\1', r'\1')]]
+
+def _normalize_indic(text):
+    """Lowercased NFC text without zero-width joiners and with sentence marks (dandas) as spaces"""
+    text = unicodedata.normalize('NFC', str(text)).lower()
+    return text.replace('\u200c', '').replace('\u200d', '').replace('\u0964', ' ').replace('\u0965', ' ')
+
+def _transliterate(text):
+    """Normalized text with Brahmic-script letters spelled in Latin, and Latin spelling
+    variants folded together.
+    
+    Approximate by design: it only has to bring regional spellings of skill
+    words close enough to the English ones for character n-grams to match.
+    Doubles as the preprocessor of the character n-gram vectorizer.
+    """
+    text = _normalize_indic(text)
+    if _BRAHMIC_RE.search(text):
+        text = _spell_brahmic(text)
+    for pattern, replacement in _SPELLING_FOLDS:
+        text = pattern.sub(replacement, text)
+    return text
+
+def _spell_brahmic(text):
+    """Latin spelling of the Brahmic-script letters in the text"""
+    letters = []
+    # Whether the last letter was a consonant still carrying its inherent 'a',
+    # which is voiced only before another letter of the word
+    inherent = False
+    for ch in text:
+        code = ord(ch)
+        offset = (code - 0x0900) & 0x7F if 0x0900 <= code <= 0x0D7F else None
+        if offset is None:
+            letters.append(ch)
+            inherent = False
+        elif offset in _BRAHMIC_VOWEL_SIGNS or offset == _BRAHMIC_VIRAMA:
+            letters.append(_BRAHMIC_VOWEL_SIGNS.get(offset, ''))
+            inherent = False
+        elif offset in _BRAHMIC_CONSONANTS or offset in _BRAHMIC_VOWELS or offset in _BRAHMIC_SIGNS:
+            if inherent:
+                letters.append('a')
+            letters.append(_BRAHMIC_CONSONANTS.get(offset) or _BRAHMIC_VOWELS.get(offset) or _BRAHMIC_SIGNS[offset])
+            inherent = offset in _BRAHMIC_CONSONANTS
+    return ''.join(letters)
+
+class _TermLexicon:
+    """Offline lookup of regional-language skill and job words, in native script or
+    romanized, to their English terms"""
+    def __init__(self, path=INDIC_TERMS_PATH):
+        self.terms = {}
+        self.max_words = 0
+        if not os.path.exists(path):
+            print(f"Warning: term table {path} not found; regional-language queries are matched by spelling only")
+            return
+        
+        table = pd.read_csv(path, dtype=str, keep_default_na=False)
+        for row in table.itertuples(index=False):
+            for language in INDIC_LANGUAGES:
+                for term in getattr(row, language).split('|'):
+                    key = ' '.join(self._words(term))
+                    if key:
+                        self.terms.setdefault(key, row.english)
+        self.max_words = max(len(key.split()) for key in self.terms)
+    
+    @staticmethod
+    def _words(text):
+        return _INDIC_WORD_RE.findall(_normalize_indic(text))
+    
+    def translate(self, text):
+        """English terms for the regional-language words and phrases in the text, longest match first"""
+        return self.match(text)[0]
+    
+    def match(self, text):
+        """English terms for the regional-language words and phrases in the text, longest
+        match first, and the words left without one"""
+        words = self._words(text)
+        terms, unmatched = [], []
+        i = 0
+        while i < len(words):
+            for n in range(min(self.max_words, len(words) - i), 0, -1):
+                term = self.terms.get(' '.join(words[i:i + n]))
+                if term is not None:
+                    terms.append(term)
+                    i += n
+                    break
+            else:
+                unmatched.append(words[i])
+                i += 1
+        return terms, unmatched
+
+class _StringColumn:
+    """Read-only column of strings stored as one UTF-8 byte buffer plus offsets"""
+    def __init__(self, buffer, offsets):
+        self.buffer = buffer
+        self.offsets = offsets
+    
+    @classmethod
+    def from_strings(cls, values):
+        return cls.from_bytes([str(value).encode('utf-8') for value in values])
+    
+    @classmethod
+    def from_bytes(cls, encoded):
+        offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+        np.cumsum([len(b) for b in encoded], out=offsets[1:])
+        return cls(np.frombuffer(b''.join(encoded), dtype=np.uint8), offsets)
+    
+    def __len__(self):
+        return len(self.offsets) - 1
+    
+    def __getitem__(self, idx):
+        return self.raw(idx).decode('utf-8')
+    
+    def raw(self, idx):
+        """The UTF-8 bytes of one string"""
+        return self.buffer[self.offsets[idx]:self.offsets[idx + 1]].tobytes()
+
+class _ExtendedColumn:
+    """A string column followed by the values of jobs appended after it"""
+    def __init__(self, column, values):
+        if isinstance(column, _ExtendedColumn):
+            column, values = column.column, column.values + values
+        self.column = column
+        self.values = values
+    
+    def __len__(self):
+        return len(self.column) + len(self.values)
+    
+    def __getitem__(self, idx):
+        return self.column[idx] if idx < len(self.column) else self.values[idx - len(self.column)]
+    
+    def raw(self, idx):
+        return self.column.raw(idx) if idx < len(self.column) else self.values[idx - len(self.column)].encode('utf-8')
+
+class _ExtendedArray:
+    """A per-job array followed by the rows of jobs appended after it.
+    
+    The appended rows are kept in a small segment of their own, so appending
+    costs per appended job and never copies (or unshares) the artifact's
+    array. Indexing with a job index, a slice or an array of job indices
+    works as on the concatenated array; np.asarray concatenates.
+    """
+    def __init__(self, array, rows):
+        if isinstance(array, _ExtendedArray):
+            array, rows = array.array, np.concatenate([array.rows, rows])
+        self.array = array
+        self.rows = np.asarray(rows, dtype=array.dtype)
+    
+    def __len__(self):
+        return len(self.array) + len(self.rows)
+    
+    def __array__(self, dtype=None, copy=None):
+        return np.concatenate([self.array, self.rows]).astype(dtype or self.array.dtype, copy=False)
+    
+    def __getitem__(self, idx):
+        n = len(self.array)
+        if isinstance(idx, (int, np.integer)):
+            return self.array[idx] if idx < n else self.rows[idx - n]
+        if isinstance(idx, slice):
+            start, stop, step = idx.indices(len(self))
+            if step == 1 and start >= n:
+                return self.rows[start - n:stop - n]
+            idx = np.arange(start, stop, step)
+        
+        idx = np.asarray(idx)
+        if idx.max(initial=-1) < n:
+            return self.array[idx]
+        in_array = idx < n
+        values = np.empty(idx.shape + self.array.shape[1:], dtype=self.array.dtype)
+        values[in_array] = self.array[idx[in_array]]
+        values[~in_array] = self.rows[idx[~in_array] - n]
+        return values
+
 class CareerPathRecommender:
-    def __init__(self, csv_file_path="job_descriptions.csv"):
+    def __init__(self, csv_file_path="job_descriptions.csv", artifact_dir=None, content_engine='tfidf',
+                 pipeline=None):
+        if content_engine not in CONTENT_ENGINES:
+            raise ValueError(f"Unknown content engine: {content_engine}")
         self.csv_file = csv_file_path
+        self.content_engine = content_engine
+        # Ranking pipeline settings, see DEFAULT_PIPELINE
+        self.pipeline = load_pipeline_config(overrides=pipeline)
+        suffix = '_model' if content_engine == 'tfidf' else f'_{content_engine}_model'
+        self.artifact_dir = artifact_dir or os.path.splitext(csv_file_path)[0] + suffix
+        # Append-only JSONL of job documents posted, edited or removed since the
+        # corpus was exported; the model covers its first changes_offset bytes
+        self.changes_file = os.path.splitext(csv_file_path)[0] + '_changes.jsonl'
+        self.changes_offset = 0
+        # User and job factors trained on application history by car_als.py
+        self.als_dir = os.path.splitext(csv_file_path)[0] + '_als'
+        self.als_trained_at = None
+        self.user_factors = None
+        self.user_factor_rows = {}
+        self.job_factors = None
+        self.als_job_rows = {}
+        # Row of each job in job_factors, -1 for jobs without applications
+        self.job_factor_rows = None
+        self.artifact_loaded = False
+        self.data_hash = None
+        # (size, mtime) of the corpus, artifact and factor files the model was loaded from
+        self.corpus_stamp = None
+        self.source_stamps = None
         self.df = None
+        self.n_jobs = 0
+        # Jobs in the artifact; jobs appended from the change file since come after them
+        self.n_artifact_jobs = 0
+        # Job ids (UTF-8 bytes) of the artifact's jobs in sorted order, and the
+        # job index of each; ids of appended jobs map to their index directly
+        self.job_id_sorted = None
+        self.job_id_order = None
+        self.appended_ids = {}
+        # TF-IDF rows (and LSA embeddings) of appended jobs, None when there are none
+        self.appended_matrix = None
+        self.appended_embeddings = None
+        # Tombstones: True for jobs removed or replaced since, None when there are none
+        self.removed = None
+        self.removed_count = 0
+        # Duration and peak RSS after each phase of the last model load/build
+        self.load_stats = {}
+        # Latency histograms per recommendation stage and per load/build phase
+        self.stage_latency = {}
+        self.phase_latency = {}
+        # Histograms of how many candidates each ranking pipeline stage kept
+        self.pipeline_kept = {}
+        self.model_built_at = None
+        self.model_loaded_at = None
+        # Scored shortlists of recent profiles, see recommend_career_path
+        self.score_cache = _ScoreCache()
+        # Called as progress_callback(phase, stats) after each load/build phase
+        self.progress_callback = None
+        # Job columns needed to display recommendations, kept as string columns
+        # so they can be memory-mapped from the model artifact
+        self.display_columns = ['job_title', 'skills', 'combined_text']
+        self.job_columns = {}
+        # The fixed fields of each job's recommendation card, serialized once:
+        # the inside of a JSON object, completed per request with the match
+        # score and reasoning
+        self.job_cards = None
+        # Job locations, dictionary-encoded: distinct values plus a code per job
+        self.location_values = None
+        self.location_codes = None
+        # Geocoded (lat, lon) per distinct location, NaN where unknown, and the
+        # jobs at each location: (job indices ordered by location code, offsets)
+        self.location_coords = None
+        self.location_postings = None
+        # KD-tree over the geocoded locations, and the location code of each tree point
+        self.location_tree = None
+        self.location_tree_codes = None
         self.tfidf = None
         self.tfidf_matrix = None
+        # Inverted index: term -> postings of (row, tf-idf weight), i.e. the
+        # TF-IDF matrix in CSC layout with its rows sharded by location cluster:
+        # row r is job feature_postings['location_cluster'][0][r], so each
+        # cluster's jobs are one contiguous run of every term's postings
+        self.term_postings = None
+        # Category index: feature -> (job indices ordered by code, offsets per code)
+        self.feature_postings = {}
+        # Filter bitmaps: feature -> (codes x packed job bits) uint8 array, bit j
+        # of row c set when job j has that feature code
+        self.feature_bitmaps = {}
+        # Character n-gram index over the words of job titles and skills, to
+        # match regional-language words by spelling: the vectorizer, the words
+        # (TF-IDF vocabulary terms) and their n-gram rows
+        self.char_tfidf = None
+        self.char_words = []
+        self.char_matrix = None
+        # LSA engine: term -> component projection and unit-length job embeddings
+        self.lsa_components = None
+        self.lsa_embeddings = None
         self.scaler = StandardScaler()
         self.skill_encoder = LabelEncoder()
         self.location_encoder = LabelEncoder()
+        self.experience_encoder = LabelEncoder()
+        self.work_type_encoder = LabelEncoder()
+        self.job_type_encoder = LabelEncoder()
+        # Typed numeric job attributes (JOB_ATTRIBUTES), present for job exports only
+        self.job_attributes = {}
         self.education_levels = {
             'below_10th': 1, '10th_pass': 2, '12th_pass': 3, 
             'diploma': 4, 'graduate': 5, 'postgraduate': 6
@@ -42,66 +727,124 @@ class CareerPathRecommender:
             'language': ['local_language', 'hindi', 'basic_english'],
             'disability': ['accessible', 'disability_friendly', 'inclusive']
         }
+        self.experience_keywords = {
+            'entry': ['fresher', 'entry', 'beginner', '0-1 year'],
+            'intermediate': ['2-3 year', '2-4 year', 'intermediate'],
+            'senior': ['senior', '5+ year', 'experienced']
+        }
+        self.work_type_keywords = {
+            'remote': ['remote', 'work from home', 'wfh'],
+            'hybrid': ['hybrid', 'flexible']
+        }
+        self.major_cities = ['mumbai', 'delhi', 'bangalore', 'chennai', 'kolkata', 'pune', 'hyderabad']
+        self.gazetteer = _Gazetteer()
+        self.lexicon = _TermLexicon()
+        self.metro_coords = np.array([self.gazetteer.geocode(city) or (np.nan, np.nan)
+                                      for city in self.major_cities])
+        # Categorical job features used by collaborative filtering, with the
+        # weight a match on each contributes to the collaborative score
+        self.collaborative_weights = {
+            'skill_category': 0.4, 'location_cluster': 0.3,
+            'experience_level': 0.2, 'work_type': 0.1
+        }
+        self.feature_encoders = {
+            'skill_category': self.skill_encoder.fit(list(self.skill_categories) + ['general']),
+            'location_cluster': self.location_encoder.fit(self.major_cities + ['other', 'general']),
+            'experience_level': self.experience_encoder.fit(['entry', 'intermediate', 'senior']),
+            'work_type': self.work_type_encoder.fit(['onsite', 'remote', 'hybrid']),
+            'job_type': self.job_type_encoder.fit(JOB_TYPES + ['unspecified'])
+        }
+        self.feature_codes = {}
+        # Keywords checked against each job by the constraint scorer; every
+        # keyword becomes one column of the boolean constraint feature matrix
+        self.constraint_keywords = sorted(
+            {kw for kws in self.barrier_impact.values() for kw in kws} |
+            {'onsite', 'remote', 'full_time', 'flexible', 'graduate', 'postgraduate', '10th'}
+        )
+        self.constraint_features = None
+        # Every keyword matched against job text, each scanned once per job
+        self.text_keywords = sorted(
+            {kw for kws in self.skill_categories.values() for kw in kws} |
+            {kw for kws in self.experience_keywords.values() for kw in kws} |
+            {kw for kws in self.work_type_keywords.values() for kw in kws} |
+            set(self.constraint_keywords)
+        )
+        # Serialized response blocks that depend only on the primary interest
+        # (learning path and mentorship suggestions) or on one barrier
+        self.interest_blocks = {
+            interest: (_dumps(self._generate_learning_path({'primary_interest': interest})),
+                       _dumps(self._generate_mentorship_suggestions({'primary_interest': interest})))
+            for interest in self.skill_categories
+        }
+        self.barrier_blocks = {
+            barrier: [_dumps(solution) for solution in self._generate_barrier_solutions({'barriers': [barrier]})]
+            for barrier in self.barrier_impact
+        }
+        
+    def load_and_preprocess_data(self, rebuild=False):
+        """Load and preprocess the job dataset.
         
-    def load_and_preprocess_data(self):
-        """Load and preprocess the job dataset"""
+        rebuild skips a matching artifact, e.g. to compact the job change file into it.
+        """
         try:
             # Check if CSV file exists, if not create sample data
-            if not os.path.exists(self.csv_file):
+            if not os.path.exists(self.csv_file) and self._corpus_format() == 'csv':
                 self._create_sample_data()
             
-            self.df = pd.read_csv(self.csv_file)
-            
-            # Clean column names
-            self.df.columns = self.df.columns.str.strip().str.lower().str.replace(' ', '_')
+            # Reuse the persisted model if it was built from the same data
+            self.artifact_loaded = False
+            self.load_stats = {}
+            started = time.perf_counter()
+            # Taken before hashing so an edit made meanwhile still reads as a change
+            self.corpus_stamp = _file_stamp(self.csv_file)
+            self.data_hash = self._compute_data_hash()
+            if not rebuild and self._load_artifact():
+                self._record_phase('load_artifact', started)
+                return True
             
-            # Handle different possible column name variations
-            column_mapping = {
-                'job_descri': 'job_description',
-                'job_title': 'job_title',
-                'location': 'location',
-                'skills': 'skills'
-            }
-            
-            for old_col, new_col in column_mapping.items():
-                if old_col in self.df.columns:
-                    self.df = self.df.rename(columns={old_col: new_col})
-            
-            # Ensure required columns exist
-            required_cols = ['job_title', 'location', 'skills', 'job_description']
-            missing_cols = [col for col in required_cols if col not in self.df.columns]
-            if missing_cols:
-                for col in missing_cols:
-                    self.df[col] = 'Not specified'
-            
-            # Clean and preprocess data
-            self.df = self.df.dropna(subset=['job_title'])
-            self.df = self.df.fillna('Not specified')
-            
-            # Clean text data
-            text_columns = ['job_title', 'skills', 'job_description', 'location']
-            for col in text_columns:
-                if col in self.df.columns:
-                    self.df[col] = self.df[col].astype(str).str.lower().str.strip()
-            
-            # Create enhanced features
-            self.df['combined_text'] = (
-                self.df['job_title'].fillna('') + ' ' + 
-                self.df['skills'].fillna('') + ' ' + 
-                self.df['job_description'].fillna('')
-            )
-            
-            # Extract skill categories
-            self.df['skill_category'] = self.df['combined_text'].apply(self._categorize_skills)
+            started = time.perf_counter()
+            if self._corpus_format() == 'csv':
+                # Stream the CSV in chunks, keeping only the columns needed later
+                frames = [self._preprocess_chunk(chunk)
+                          for chunk in pd.read_csv(self.csv_file, chunksize=CSV_CHUNK_ROWS, dtype=str)]
+                if not frames:
+                    raise ValueError("No jobs found in dataset")
+                self.df = pd.concat(frames, ignore_index=True)
+                del frames
+            else:
+                self.df = (self._read_job_export() if self._corpus_format() in JOB_EXPORT_FORMATS.values()
+                           else self._read_columnar_corpus())
+                if self.df.empty:
+                    raise ValueError("No jobs found in dataset")
+            if 'job_id' not in self.df.columns:
+                # Jobs of a CSV or columnar corpus are addressed by row number
+                self.df['job_id'] = np.arange(len(self.df)).astype(str)
+            self._fold_job_changes()
+            self.df['location'] = self.df['location'].astype('category')
+            self._record_phase('read_csv', started)
             
-            # Extract experience level
-            self.df['experience_level'] = self.df['combined_text'].apply(self._extract_experience_level)
+            # Extract skill category, experience level, work type (remote/onsite/hybrid),
+            # location cluster and the keyword hits used by knowledge-based filtering
+            started = time.perf_counter()
+            self._extract_job_features()
+            self._record_phase('extract_features', started)
             
-            # Extract work type (remote/onsite/hybrid)
-            self.df['work_type'] = self.df['combined_text'].apply(self._extract_work_type)
+            # Encode categorical features used by collaborative filtering
+            started = time.perf_counter()
+            self._build_collaborative_features()
             
-            # Create location clusters for better matching
-            self.df['location_cluster'] = self._create_location_clusters()
+            self.job_columns = {col: _StringColumn.from_strings(self.df[col]) for col in self.display_columns}
+            self.job_cards = _StringColumn.from_bytes(self._job_cards(self.df))
+            self.location_codes = self.df['location'].cat.codes.to_numpy().astype(np.int32)
+            self.location_values = np.asarray(self.df['location'].cat.categories, dtype=str)
+            self.job_attributes = {name: self.df[name].to_numpy(dtype=np.float32)
+                                   for name in JOB_ATTRIBUTES if name in self.df.columns}
+            job_ids = np.char.encode(self.df['job_id'].to_numpy(dtype=str), 'utf-8')
+            self.job_id_order = np.argsort(job_ids, kind='stable').astype(np.int32)
+            self.job_id_sorted = job_ids[self.job_id_order]
+            self.df = self.df.drop(columns='job_id')
+            self.n_jobs = self.n_artifact_jobs = len(self.df)
+            self._record_phase('encode_features', started)
             
             return True
             
@@ -109,6 +852,158 @@ class CareerPathRecommender:
             print(f"Error loading dataset: {str(e)}")
             return False
     
+    def _corpus_format(self):
+        """'csv', or the columnar or job export format of the job corpus file"""
+        extension = os.path.splitext(self.csv_file)[1].lower()
+        return COLUMNAR_FORMATS.get(extension) or JOB_EXPORT_FORMATS.get(extension, 'csv')
+    
+    def _read_job_export(self):
+        """Read active jobs, with their structured fields, from a JSON or JSONL jobs export"""
+        with open(self.csv_file, encoding='utf-8') as f:
+            if self._corpus_format() == 'json':
+                jobs = json.load(f)
+            else:
+                jobs = (json.loads(line) for line in f if line.strip())
+            return self._job_frame(jobs)
+    
+    def _job_frame(self, jobs):
+        """Normalized frame of the active jobs among job documents, with their structured fields"""
+        columns = {name: [] for name in ['job_id', 'job_title', 'location', 'skills', 'combined_text',
+                                         'work_type', 'job_type', 'category'] + JOB_ATTRIBUTES}
+        for position, job in enumerate(jobs):
+            error = _job_document_error(job)
+            if error:
+                print(f"Warning: skipping job document {position}: {error}")
+                continue
+            if job.get('deleted') or job.get('status', 'active') != 'active' or not job.get('title'):
+                continue
+            salary, experience = job.get('salary') or {}, job.get('experience') or {}
+            skills = ', '.join(job.get('skills') or [])
+            columns['job_id'].append(_document_id(job) or str(position))
+            columns['job_title'].append(job['title'])
+            columns['location'].append(job.get('location') or 'Not specified')
+            columns['skills'].append(skills)
+            columns['combined_text'].append(' '.join(
+                [job['title'], skills, job.get('description') or ''] +
+                (job.get('requirements') or []) + (job.get('tags') or [])))
+            columns['work_type'].append(job.get('workMode'))
+            columns['job_type'].append(job.get('jobType'))
+            columns['category'].append(job.get('category'))
+            columns['salary_min'].append(_mongo_number(salary.get('min')))
+            columns['salary_max'].append(_mongo_number(salary.get('max')))
+            columns['experience_min'].append(_mongo_number(experience.get('min', 0)))
+            columns['experience_max'].append(_mongo_number(experience.get('max', 10)))
+        
+        df = pd.DataFrame(columns)
+        for col in CORPUS_COLUMNS:
+            df[col] = df[col].astype(str).str.lower().str.strip()
+        # Values outside the schema enums count as unknown
+        df['work_type'] = df['work_type'].where(df['work_type'].isin(['onsite', 'remote', 'hybrid']), 'onsite')
+        df['job_type'] = df['job_type'].where(df['job_type'].isin(JOB_TYPES), 'unspecified')
+        return df
+    
+    def _read_columnar_corpus(self):
+        """Read a Parquet or Arrow IPC job corpus, memory-mapping only the columns used"""
+        if pa is None:
+            raise ImportError("Reading a Parquet/Arrow job corpus requires pyarrow")
+        
+        if self._corpus_format() == 'arrow':
+            # Arrow IPC files are read zero-copy from the mapping, so columns
+            # that aren't selected are never paged in
+            table = pa.ipc.open_file(pa.memory_map(self.csv_file)).read_all()
+            schema = table.schema
+        else:
+            parquet = pq.ParquetFile(self.csv_file, memory_map=True)
+            schema = parquet.schema_arrow
+        
+        names = _canonical_column_names(schema.names)
+        normalized = (schema.metadata or {}).get(NORMALIZED_CORPUS_KEY) == b'1'
+        wanted = CORPUS_COLUMNS if normalized else ['job_title', 'location', 'skills', 'job_description']
+        columns = [raw for raw, name in names.items() if name in wanted]
+        
+        if normalized:
+            # Cleaned and lowercased at export time, so the columns are used as they are
+            if self._corpus_format() == 'parquet':
+                table = parquet.read(columns=columns)
+            df = table.select(columns).to_pandas()
+            df.columns = [names[column] for column in columns]
+            return df[CORPUS_COLUMNS]
+        
+        # Any other columnar corpus is normalized batch by batch, like the CSV
+        if self._corpus_format() == 'parquet':
+            batches = parquet.iter_batches(batch_size=CSV_CHUNK_ROWS, columns=columns)
+        else:
+            batches = table.select(columns).to_batches(max_chunksize=CSV_CHUNK_ROWS)
+        frames = [self._preprocess_chunk(batch.to_pandas()) for batch in batches]
+        return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=CORPUS_COLUMNS)
+    
+    def export_corpus(self, path):
+        """Write the job CSV as a normalized Parquet or Arrow IPC corpus for fast loading"""
+        if pa is None:
+            raise ImportError("Writing a Parquet/Arrow job corpus requires pyarrow")
+        corpus_format = COLUMNAR_FORMATS.get(os.path.splitext(path)[1].lower())
+        if corpus_format is None:
+            raise ValueError(f"Unknown corpus format for {path}; use one of {', '.join(COLUMNAR_FORMATS)}")
+        
+        schema = pa.schema([(column, pa.string()) for column in CORPUS_COLUMNS],
+                           metadata={NORMALIZED_CORPUS_KEY: b'1'})
+        # Arrow IPC stays uncompressed so that it can be memory-mapped
+        writer = (pa.ipc.new_file(path, schema) if corpus_format == 'arrow'
+                  else pq.ParquetWriter(path, schema))
+        rows = 0
+        try:
+            for chunk in pd.read_csv(self.csv_file, chunksize=CSV_CHUNK_ROWS, dtype=str):
+                chunk = self._preprocess_chunk(chunk)
+                writer.write_table(pa.Table.from_pandas(chunk[CORPUS_COLUMNS], schema=schema,
+                                                        preserve_index=False))
+                rows += len(chunk)
+        finally:
+            writer.close()
+        return rows
+    
+    def _preprocess_chunk(self, chunk):
+        """Normalize one chunk of the job CSV and build its combined text"""
+        # Clean column names, mapping the different possible variations
+        chunk = chunk.rename(columns=_canonical_column_names(chunk.columns))
+        
+        # Ensure required columns exist
+        required_cols = ['job_title', 'location', 'skills', 'job_description']
+        for col in required_cols:
+            if col not in chunk.columns:
+                chunk[col] = 'Not specified'
+        
+        # Clean and preprocess data
+        chunk = chunk.dropna(subset=['job_title'])
+        chunk = chunk[required_cols].fillna('Not specified')
+        
+        # Clean text data
+        for col in required_cols:
+            chunk[col] = chunk[col].astype(str).str.lower().str.strip()
+        
+        # Create enhanced features; the description is only needed as part of it
+        chunk['combined_text'] = chunk['job_title'] + ' ' + chunk['skills'] + ' ' + chunk['job_description']
+        return chunk.drop(columns='job_description')
+    
+    def _record_phase(self, phase, started):
+        """Record how long a load/build phase took and the peak RSS after it"""
+        elapsed = time.perf_counter() - started
+        self.load_stats[phase] = {
+            'seconds': round(elapsed, 3),
+            'peak_rss_mb': _peak_rss_mb()
+        }
+        self.phase_latency.setdefault(phase, _Histogram()).observe(elapsed)
+        if self.progress_callback is not None:
+            self.progress_callback(phase, self.load_stats[phase])
+    
+    @contextmanager
+    def _timed(self, stage):
+        """Time a recommendation stage into its latency histogram"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.stage_latency.setdefault(stage, _Histogram()).observe(time.perf_counter() - started)
+    
     def _create_sample_data(self):
         """Create sample job data if CSV doesn't exist"""
         sample_jobs = [
@@ -127,177 +1022,1073 @@ class CareerPathRecommender:
         df = pd.DataFrame(sample_jobs)
         df.to_csv(self.csv_file, index=False)
     
-    def _categorize_skills(self, text):
-        """Categorize skills based on job description"""
-        categories = []
-        text = text.lower()
-        
-        for category, keywords in self.skill_categories.items():
-            if any(keyword in text for keyword in keywords):
-                categories.append(category)
+    def _extract_job_features(self):
+        """Derive categorical job features from one keyword-matching pass per job"""
+        self.constraint_features = self._job_features(self.df)
         
-        return categories[0] if categories else 'general'
+        # Locations are geocoded once per distinct value, not once per job
+        locations = self.df['location'].cat.categories
+        self.location_coords = self._geocode_locations(locations)
+        clusters = np.array([self._get_location_cluster(location) for location in locations], dtype=object)
+        self.df['location_cluster'] = clusters[self.df['location'].cat.codes.to_numpy()]
     
-    def _extract_experience_level(self, text):
-        """Extract experience level from job description"""
-        text = text.lower()
-        if any(word in text for word in ['fresher', 'entry', 'beginner', '0-1 year']):
-            return 'entry'
-        elif any(word in text for word in ['2-3 year', '2-4 year', 'intermediate']):
-            return 'intermediate'
-        elif any(word in text for word in ['senior', '5+ year', 'experienced']):
-            return 'senior'
+    def _job_features(self, df):
+        """Set the skill category, experience level, work type and job type of the jobs in df.
+        
+        Returns their constraint keyword hits.
+        """
+        if 'job_type' in df.columns:
+            text_hits = self._structured_job_features(df)
         else:
-            return 'entry'
+            text_hits = self._match_all(df['combined_text'].tolist(), self.text_keywords)
+            df['skill_category'] = self._first_match(text_hits, self.text_keywords, self.skill_categories, 'general')
+            df['experience_level'] = self._first_match(text_hits, self.text_keywords, self.experience_keywords, 'entry')
+            df['work_type'] = self._first_match(text_hits, self.text_keywords, self.work_type_keywords, 'onsite')
+            df['job_type'] = 'unspecified'
+        return text_hits[:, [self.text_keywords.index(kw) for kw in self.constraint_keywords]]
     
-    def _extract_work_type(self, text):
-        """Extract work type from job description"""
-        text = text.lower()
-        if any(word in text for word in ['remote', 'work from home', 'wfh']):
-            return 'remote'
-        elif any(word in text for word in ['hybrid', 'flexible']):
-            return 'hybrid'
-        else:
-            return 'onsite'
+    def _geocode_locations(self, locations):
+        """(lat, lon) of each location, NaN where the gazetteer doesn't know it"""
+        return np.array([self.gazetteer.geocode(location) or (np.nan, np.nan)
+                         for location in locations], dtype=np.float64).reshape(-1, 2)
+    
+    def _structured_job_features(self, df):
+        """Job features of a jobs export, taken from its fields where it has them.
+        
+        Work type, job type and experience level come straight from the
+        structured fields, and so do the constraint keywords they answer;
+        only skill category and the remaining constraint keywords are mined
+        from the text. Returns the keyword hit matrix over text_keywords.
+        """
+        mined = sorted({kw for kws in self.skill_categories.values() for kw in kws} |
+                       (set(self.constraint_keywords) - set(STRUCTURED_CONSTRAINTS)))
+        text_hits = np.zeros((len(df), len(self.text_keywords)), dtype=bool)
+        text_hits[:, [self.text_keywords.index(kw) for kw in mined]] = self._match_all(
+            df['combined_text'].tolist(), mined)
+        for keyword, (column, values) in STRUCTURED_CONSTRAINTS.items():
+            text_hits[:, self.text_keywords.index(keyword)] = df[column].isin(values).to_numpy()
+        
+        mined_category = self._first_match(text_hits, self.text_keywords, self.skill_categories, 'general')
+        df['skill_category'] = df['category'].map(JOB_CATEGORY_SKILLS).fillna(
+            pd.Series(mined_category, index=df.index))
+        experience = df['experience_min'].fillna(0).to_numpy()
+        df['experience_level'] = np.select([experience <= 1, experience <= 4], ['entry', 'intermediate'],
+                                                default='senior')
+        return text_hits
+    
+    def _read_job_changes(self, start):
+        """Job documents in the change file after byte offset start, and the offset read up to.
+        
+        Only complete lines are read; a line still being written waits for the next read.
+        """
+        try:
+            with open(self.changes_file, 'rb') as f:
+                f.seek(start)
+                data = f.read()
+        except FileNotFoundError:
+            return [], start
+        
+        end = data.rfind(b'\n') + 1
+        jobs = []
+        for line in data[:end].splitlines():
+            if line.strip():
+                try:
+                    jobs.append(json.loads(line))
+                except json.JSONDecodeError as e:
+                    print(f"Warning: skipping malformed job change: {str(e)}")
+        return jobs, start + end
     
-    def _create_location_clusters(self):
-        """Create location clusters for better matching"""
-        if 'location' not in self.df.columns:
-            return ['general'] * len(self.df)
+    def _fold_job_changes(self):
+        """Apply the whole change file to the freshly read corpus"""
+        jobs, self.changes_offset = self._read_job_changes(0)
+        latest = _latest_job_documents(jobs)
+        if latest:
+            frame = self._job_frame(latest.values())
+            kept = self.df[~self.df['job_id'].isin(list(latest))]
+            self.df = pd.concat([kept, frame[self.df.columns]], ignore_index=True)
+    
+    def with_job_changes(self):
+        """This model with the job changes recorded since applied, as a new snapshot.
+        
+        Returns self when there is nothing new. The snapshot shares everything
+        it doesn't change with this one, so in-flight requests are unaffected.
+        """
+        jobs, offset = self._read_job_changes(self.changes_offset)
+        if offset == self.changes_offset:
+            return self
+        snapshot = copy.copy(self)
+        snapshot._apply_job_changes(jobs, offset)
+        return snapshot
+    
+    def _apply_job_changes(self, jobs, offset):
+        """Tombstone every job the documents replace or remove, and append the active ones"""
+        self.changes_offset = offset
+        latest = _latest_job_documents(jobs)
+        if not latest:
+            return
+        
+        replaced = [idx for idx in map(self._job_index, latest) if idx is not None]
+        frame = self._job_frame(latest.values())
+        if self._corpus_format() not in JOB_EXPORT_FORMATS.values():
+            # Jobs joining a text-only corpus get their features from text, like the rest
+            frame = frame[['job_id'] + CORPUS_COLUMNS].copy()
+        if len(frame):
+            self._append_jobs(frame)
+        
+        if replaced:
+            # A new sorted array, so the cost is per tombstone rather than per job
+            self.removed = np.union1d(self.removed if self.removed is not None else [], replaced).astype(np.intp)
+            self.removed_count = len(self.removed)
+    
+    def _append_jobs(self, frame):
+        """Append normalized jobs after the current ones.
         
-        major_cities = ['mumbai', 'delhi', 'bangalore', 'chennai', 'kolkata', 'pune', 'hyderabad']
-        clusters = []
+        The text is vectorized against the existing vocabulary and IDF weights,
+        and the per-job arrays gain a segment holding just the appended jobs'
+        rows, so the cost is per appended job. Nothing is modified in place,
+        since other snapshots may still be reading it.
+        """
+        constraint_features = self._job_features(frame)
         
-        for location in self.df['location']:
-            location = str(location).lower()
-            matched_city = next((city for city in major_cities if city in location), 'other')
-            clusters.append(matched_city)
+        locations = frame['location'].tolist()
+        known = {location: code for code, location in enumerate(self.location_values)}
+        new_locations = [location for location in dict.fromkeys(locations) if location not in known]
+        if new_locations:
+            known.update((location, len(self.location_values) + i) for i, location in enumerate(new_locations))
+            self.location_values = np.concatenate([self.location_values, np.asarray(new_locations, dtype=str)])
+            self.location_coords = np.vstack([self.location_coords, self._geocode_locations(new_locations)])
+        clusters = {location: self._get_location_cluster(location) for location in set(locations)}
+        frame['location_cluster'] = [clusters[location] for location in locations]
         
-        return clusters
+        # The filter bitmaps cover only the artifact's jobs; _allowed_jobs
+        # matches appended jobs on their codes
+        self.feature_codes = {
+            feature: _ExtendedArray(self.feature_codes[feature], encoder.transform(frame[feature]).astype(np.int8))
+            for feature, encoder in self.feature_encoders.items()
+        }
+        self.constraint_features = _ExtendedArray(self.constraint_features, constraint_features)
+        self.location_codes = _ExtendedArray(self.location_codes, [known[location] for location in locations])
+        self.job_attributes = {name: _ExtendedArray(values, frame[name].to_numpy(dtype=np.float32))
+                               for name, values in self.job_attributes.items()}
+        self.job_columns = {col: _ExtendedColumn(column, frame[col].tolist())
+                            for col, column in self.job_columns.items()}
+        self.job_cards = _ExtendedColumn(self.job_cards, [card.decode('utf-8') for card in self._job_cards(frame)])
+        if self.job_factor_rows is not None:
+            # An edited job keeps the factors learned from its applications
+            self.job_factor_rows = _ExtendedArray(self.job_factor_rows, [self.als_job_rows.get(job_id, -1)
+                                                                         for job_id in frame['job_id']])
+        
+        rows = self.tfidf.transform(frame['combined_text'])
+        if self.appended_matrix is not None:
+            rows = sp.vstack([self.appended_matrix, rows], format='csr')
+        self.appended_matrix = rows
+        new_words = sorted(set(self._index_words(self._char_index_text(frame).unique())) - set(self.char_words))
+        if new_words:
+            self.char_words = self.char_words + new_words
+            self.char_matrix = sp.vstack([self.char_matrix, self.char_tfidf.transform(new_words)], format='csr')
+        if self.content_engine == 'lsa':
+            self.appended_embeddings = normalize(rows @ self.lsa_components.T).astype(np.float32)
+        
+        self.appended_ids = dict(self.appended_ids)
+        self.appended_ids.update(zip(frame['job_id'], range(self.n_jobs, self.n_jobs + len(frame))))
+        self.n_jobs += len(frame)
+    
+    def _job_index(self, job_id):
+        """Index of the current version of a job, or None if it is unknown"""
+        if job_id in self.appended_ids:
+            return self.appended_ids[job_id]
+        key = job_id.encode('utf-8')
+        pos = np.searchsorted(self.job_id_sorted, key)
+        if pos < len(self.job_id_sorted) and self.job_id_sorted[pos] == key:
+            return int(self.job_id_order[pos])
+        return None
+    
+    @property
+    def n_live_jobs(self):
+        """Jobs that can be recommended, i.e. not removed"""
+        return self.n_jobs - self.removed_count
+    
+    @property
+    def pending_job_changes(self):
+        """Jobs appended or removed since the artifact was built"""
+        return self.n_jobs - self.n_artifact_jobs + self.removed_count
+    
+    def needs_compaction(self):
+        """Whether enough job changes have piled up to rebuild them into the artifact"""
+        pending = self.pending_job_changes
+        if not (pending and self.artifact_loaded):
+            return False
+        return (pending >= COMPACT_FRACTION * self.n_artifact_jobs or
+                time.time() - self.model_built_at >= COMPACT_INTERVAL)
+    
+    def _match_all(self, texts, keywords):
+        """Keyword hit matrix for all texts, split over a process pool on large corpora"""
+        if len(texts) < PARALLEL_MATCH_MIN_DOCS or (os.cpu_count() or 1) < 2:
+            return _match_keywords(texts, keywords)
+        
+        chunks = [texts[i:i + MATCH_CHUNK_SIZE] for i in range(0, len(texts), MATCH_CHUNK_SIZE)]
+        with ProcessPoolExecutor() as pool:
+            return np.vstack(list(pool.map(_match_keywords, chunks, [keywords] * len(chunks))))
+    
+    def _first_match(self, hits, keywords, groups, default):
+        """Label of the first group with a keyword hit in each row, else the default"""
+        group_hits = [hits[:, [keywords.index(kw) for kw in group]].any(axis=1) for group in groups.values()]
+        group_hits.append(np.ones(len(hits), dtype=bool))
+        labels = np.array(list(groups) + [default], dtype=object)
+        return labels[np.column_stack(group_hits).argmax(axis=1)]
+    
+    def _make_vectorizer(self):
+        """Create the TF-IDF vectorizer used for content-based filtering"""
+        return TfidfVectorizer(
+            max_features=5000,
+            stop_words='english',
+            ngram_range=(1, 2),
+            min_df=1,
+            max_df=0.95
+        )
+    
+    def _make_char_vectorizer(self):
+        """Create the character n-gram vectorizer used for regional-language queries"""
+        return TfidfVectorizer(
+            analyzer='char_wb',
+            preprocessor=_transliterate,
+            ngram_range=(3, 4),
+            max_features=50000,
+            min_df=1,
+            max_df=0.5,
+            dtype=np.float32
+        )
+    
+    @staticmethod
+    def _char_index_text(df):
+        """Text of each job whose words the character n-gram index covers"""
+        return df['job_title'] + ' ' + df['skills']
+    
+    def _index_words(self, texts):
+        """Sorted single-word TF-IDF vocabulary terms of the texts"""
+        analyze = self.tfidf.build_analyzer()
+        return sorted({term for text in texts for term in analyze(text)
+                       if ' ' not in term and term in self.tfidf.vocabulary_})
     
     def build_recommendation_models(self):
         """Build TF-IDF and ML models for recommendations"""
         try:
-            self.tfidf = TfidfVectorizer(
-                max_features=5000,
-                stop_words='english',
-                ngram_range=(1, 2),
-                min_df=1,
-                max_df=0.95
-            )
-            
-            self.tfidf_matrix = self.tfidf.fit_transform(self.df['combined_text'])
-            self._build_collaborative_features()
+            if not self.artifact_loaded:
+                self._fit_models()
+            self._load_collaborative_factors()
+            self.source_stamps = self._source_stamps(self.corpus_stamp)
             
+            # Jobs posted, edited or removed since the artifact was built
+            self._apply_job_changes(*self._read_job_changes(self.changes_offset))
             return True
             
         except Exception as e:
             print(f"Error building models: {str(e)}")
             return False
     
-    def _build_collaborative_features(self):
-        """Build features for collaborative filtering"""
-        feature_data = []
-        for _, row in self.df.iterrows():
-            features = {
-                'skill_category': row['skill_category'],
-                'location_cluster': row['location_cluster'],
-                'experience_level': row['experience_level'],
-                'work_type': row['work_type']
-            }
-            feature_data.append(features)
+    def _fit_models(self):
+        """Fit the models on the loaded jobs and serve them from a saved artifact"""
+        started = time.perf_counter()
+        self.tfidf = self._make_vectorizer()
+        self.tfidf_matrix = self.tfidf.fit_transform(self.df['combined_text'])
+        # The raw text is kept as a compact string column from here on
+        self.df = self.df.drop(columns='combined_text')
+        self._build_candidate_index()
+        self._build_location_tree()
+        shard_order, _ = self.feature_postings['location_cluster']
+        self.term_postings = self.tfidf_matrix[shard_order].tocsc()
+        self._fit_char_index()
+        if self.content_engine == 'lsa':
+            self._fit_lsa()
+        self._record_phase('fit_models', started)
+        
+        started = time.perf_counter()
+        try:
+            self.save_artifact()
+        except OSError as e:
+            print(f"Warning: could not save model artifact: {str(e)}")
+            return
         
-        self.feature_df = pd.DataFrame(feature_data)
+        # Serve from the memory-mapped artifact so the in-memory copies can be freed
+        self._load_artifact()
+        self._record_phase('save_artifact', started)
     
-    def recommend_career_path(self, user_profile):
-        """Generate comprehensive career path recommendations"""
-        # Content-based filtering using TF-IDF
-        content_scores = self._content_based_recommendation(user_profile)
+    def _load_collaborative_factors(self):
+        """Memory-map the factors trained by car_als.py, if there are any, and align them with the jobs"""
+        meta_path = os.path.join(self.als_dir, 'meta.json')
+        if not os.path.exists(meta_path):
+            return
         
-        # Collaborative filtering based on similar profiles
-        collaborative_scores = self._collaborative_filtering(user_profile)
+        with open(meta_path) as f:
+            meta = json.load(f)
         
-        # Knowledge-based filtering for constraints
-        constraint_scores = self._knowledge_based_filtering(user_profile)
+        def load(name):
+            return np.load(os.path.join(self.als_dir, f'{name}.npy'), mmap_mode='r').view(np.ndarray)
         
-        # Hybrid scoring
-        final_scores = self._hybrid_scoring(content_scores, collaborative_scores, constraint_scores, user_profile)
+        self.user_factors = load('user_factors')
+        self.job_factors = load('job_factors')
+        self.user_factor_rows = {user_id: row for row, user_id in enumerate(load('user_ids').tolist())}
+        self.als_job_rows = {job_id: row for row, job_id in enumerate(load('job_ids').tolist())}
+        self.job_factor_rows = np.full(self.n_jobs, -1, dtype=np.int32)
+        for job_id, row in self.als_job_rows.items():
+            idx = self._job_index(job_id)
+            if idx is not None:
+                self.job_factor_rows[idx] = row
+        self.als_trained_at = meta.get('trained_at')
+    
+    def _fit_char_index(self):
+        """Fit the character n-gram index over the words of job titles and skills"""
+        self.char_words = self._index_words(self._char_index_text(self.df).unique())
+        self.char_tfidf = self._make_char_vectorizer()
+        try:
+            self.char_matrix = self.char_tfidf.fit_transform(self.char_words)
+        except ValueError:
+            # Too few distinct words for the document frequency cut-off to leave any n-gram
+            self.char_tfidf.set_params(max_df=1.0)
+            self.char_matrix = self.char_tfidf.fit_transform(self.char_words)
+    
+    def _fit_lsa(self):
+        """Project the TF-IDF matrix into a low-rank dense space with truncated SVD"""
+        n_components = max(1, min(LSA_COMPONENTS, min(self.tfidf_matrix.shape) - 1))
+        svd = TruncatedSVD(n_components=n_components, random_state=42)
+        embeddings = svd.fit_transform(self.tfidf_matrix)
+        self.lsa_components = np.ascontiguousarray(svd.components_, dtype=np.float32)
+        self.lsa_embeddings = np.ascontiguousarray(normalize(embeddings), dtype=np.float32)
+    
+    def _source_stamps(self, corpus_stamp):
+        """Size and modification time of the files a rebuild reads: the corpus,
+        the artifact and the collaborative factors"""
+        return [corpus_stamp, _file_stamp(os.path.join(self.artifact_dir, 'meta.json')),
+                _file_stamp(os.path.join(self.als_dir, 'meta.json'))]
+    
+    def is_current(self, source_stamps=None):
+        """Whether none of the files the model was loaded from changed since, so a
+        rebuild would load the same model. source_stamps, when given, are those of
+        another process's model, e.g. the prefork parent's"""
+        current = self._source_stamps(_file_stamp(self.csv_file))
+        return current in (self.source_stamps, source_stamps)
+    
+    def _compute_data_hash(self):
+        """Hash the job CSV together with the feature schema to key the artifact"""
+        schema = {
+            'version': ARTIFACT_VERSION,
+            'constraint_keywords': self.constraint_keywords,
+            'keyword_groups': [self.skill_categories, self.experience_keywords,
+                               self.work_type_keywords, self.major_cities],
+            'feature_classes': {f: e.classes_.tolist() for f, e in self.feature_encoders.items()},
+            'display_columns': self.display_columns,
+            'gazetteer': self.gazetteer.digest,
+            'metro_radius_km': METRO_RADIUS_KM,
+            'content_engine': self.content_engine,
+            'lsa_components': LSA_COMPONENTS if self.content_engine == 'lsa' else None
+        }
+        digest = hashlib.sha256(json.dumps(schema, sort_keys=True).encode('utf-8'))
+        with open(self.csv_file, 'rb') as f:
+            for chunk in iter(lambda: f.read(1 << 20), b''):
+                digest.update(chunk)
+        return digest.hexdigest()
+    
+    def save_artifact(self):
+        """Write the fitted model and job features to the on-disk artifact"""
+        arrays = {
+            'idf': self.tfidf.idf_,
+            'tfidf_data': self.tfidf_matrix.data,
+            'tfidf_indices': self.tfidf_matrix.indices,
+            'tfidf_indptr': self.tfidf_matrix.indptr,
+            'postings_data': self.term_postings.data,
+            'postings_indices': self.term_postings.indices,
+            'postings_indptr': self.term_postings.indptr,
+            'char_idf': self.char_tfidf.idf_,
+            'char_data': self.char_matrix.data,
+            'char_indices': self.char_matrix.indices,
+            'char_indptr': self.char_matrix.indptr,
+            'constraint_features': self.constraint_features,
+            'location_codes': self.location_codes,
+            'location_values': self.location_values,
+            'location_coords': self.location_coords,
+            'location_postings_order': self.location_postings[0],
+            'location_postings_offsets': self.location_postings[1],
+            'job_id_sorted': self.job_id_sorted,
+            'job_id_order': self.job_id_order
+        }
+        for feature, codes in self.feature_codes.items():
+            arrays[f'codes_{feature}'] = codes
+        for feature, (order, offsets) in self.feature_postings.items():
+            arrays[f'postings_{feature}_order'] = order
+            arrays[f'postings_{feature}_offsets'] = offsets
+        for feature, bitmaps in self.feature_bitmaps.items():
+            arrays[f'bitmaps_{feature}'] = bitmaps
+        for name, values in self.job_attributes.items():
+            arrays[f'attribute_{name}'] = values
+        if self.content_engine == 'lsa':
+            arrays['lsa_components'] = self.lsa_components
+            arrays['lsa_embeddings'] = self.lsa_embeddings
+        for col, column in self.job_columns.items():
+            arrays[f'{col}_buffer'] = column.buffer
+            arrays[f'{col}_offsets'] = column.offsets
+        arrays['cards_buffer'] = self.job_cards.buffer
+        arrays['cards_offsets'] = self.job_cards.offsets
+        
+        meta = {
+            'data_hash': self.data_hash,
+            'shape': list(self.tfidf_matrix.shape),
+            'job_attributes': list(self.job_attributes),
+            'changes_offset': self.changes_offset,
+            'vocabulary': self.tfidf.get_feature_names_out().tolist(),
+            'char_vocabulary': self.char_tfidf.get_feature_names_out().tolist(),
+            'char_words': self.char_words,
+            'built_at': time.time()
+        }
+        
+        # Write into a scratch directory of our own and move it into place so
+        # readers never see a partially written artifact, and concurrent
+        # builders (other processes, other servers) never write into each other's
+        artifact_dir = os.path.abspath(self.artifact_dir)
+        tmp_dir = tempfile.mkdtemp(prefix=os.path.basename(artifact_dir) + '.', suffix='.tmp',
+                                   dir=os.path.dirname(artifact_dir))
+        try:
+            for name, array in arrays.items():
+                np.save(os.path.join(tmp_dir, f'{name}.npy'), np.ascontiguousarray(array))
+            with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+                json.dump(meta, f)
+            
+            with open(artifact_dir + '.lock', 'w') as lock:
+                if fcntl is not None:
+                    # Held while the old artifact is swapped out, which takes two steps
+                    fcntl.flock(lock, fcntl.LOCK_EX)
+                shutil.rmtree(artifact_dir, ignore_errors=True)
+                os.replace(tmp_dir, artifact_dir)
+        except BaseException:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+    
+    def _load_artifact(self):
+        """Memory-map the model artifact if it matches the current data"""
+        meta_path = os.path.join(self.artifact_dir, 'meta.json')
+        if not os.path.exists(meta_path):
+            return False
         
-        # Generate recommendations
-        recommendations = self._generate_final_recommendations(final_scores, user_profile)
+        with open(meta_path) as f:
+            meta = json.load(f)
+        if meta.get('data_hash') != self.data_hash:
+            return False
+        changes_size = os.path.getsize(self.changes_file) if os.path.exists(self.changes_file) else 0
+        if changes_size < meta['changes_offset']:
+            # The change file was truncated or replaced, so the changes folded in are unknown
+            return False
         
+        def load(name):
+            # Plain ndarray views over the mapping avoid np.memmap's per-index overhead
+            return np.load(os.path.join(self.artifact_dir, f'{name}.npy'), mmap_mode='r').view(np.ndarray)
+        
+        self.tfidf = self._make_vectorizer()
+        self.tfidf.vocabulary_ = {term: i for i, term in enumerate(meta['vocabulary'])}
+        self.tfidf.idf_ = np.array(load('idf'))
+        self.tfidf_matrix = sp.csr_matrix(
+            (load('tfidf_data'), load('tfidf_indices'), load('tfidf_indptr')),
+            shape=tuple(meta['shape']), copy=False
+        )
+        self.term_postings = sp.csc_matrix(
+            (load('postings_data'), load('postings_indices'), load('postings_indptr')),
+            shape=tuple(meta['shape']), copy=False
+        )
+        self.char_tfidf = self._make_char_vectorizer()
+        self.char_tfidf.vocabulary_ = {gram: i for i, gram in enumerate(meta['char_vocabulary'])}
+        self.char_tfidf.idf_ = np.array(load('char_idf'))
+        self.char_words = meta['char_words']
+        self.char_matrix = sp.csr_matrix(
+            (load('char_data'), load('char_indices'), load('char_indptr')),
+            shape=(len(self.char_words), len(meta['char_vocabulary'])), copy=False
+        )
+        self.constraint_features = load('constraint_features')
+        self.location_codes = load('location_codes')
+        self.location_values = load('location_values')
+        self.location_coords = load('location_coords')
+        self.location_postings = (load('location_postings_order'), load('location_postings_offsets'))
+        self._build_location_tree()
+        if self.content_engine == 'lsa':
+            self.lsa_components = load('lsa_components')
+            self.lsa_embeddings = load('lsa_embeddings')
+        self.feature_codes = {feature: load(f'codes_{feature}') for feature in self.feature_encoders}
+        self.job_columns = {
+            col: _StringColumn(load(f'{col}_buffer'), load(f'{col}_offsets'))
+            for col in self.display_columns
+        }
+        self.job_cards = _StringColumn(load('cards_buffer'), load('cards_offsets'))
+        self.feature_postings = {
+            feature: (load(f'postings_{feature}_order'), load(f'postings_{feature}_offsets'))
+            for feature in ('location_cluster', 'skill_category')
+        }
+        self.feature_bitmaps = {feature: load(f'bitmaps_{feature}') for feature in FILTER_FEATURES}
+        self.job_attributes = {name: load(f'attribute_{name}') for name in meta.get('job_attributes', [])}
+        self.job_id_sorted = load('job_id_sorted')
+        self.job_id_order = load('job_id_order')
+        self.changes_offset = meta['changes_offset']
+        self.n_jobs = self.n_artifact_jobs = meta['shape'][0]
+        self.appended_ids = {}
+        self.appended_matrix = self.appended_embeddings = self.removed = None
+        self.removed_count = 0
+        self.df = None
+        self.model_built_at = meta.get('built_at')
+        self.model_loaded_at = time.time()
+        self.artifact_loaded = True
+        return True
+    
+    def _build_candidate_index(self):
+        """Index jobs by location cluster and skill category for candidate fallback"""
+        self.feature_postings = {}
+        for feature in ('location_cluster', 'skill_category'):
+            codes = self.feature_codes[feature]
+            counts = np.bincount(codes, minlength=len(self.feature_encoders[feature].classes_))
+            offsets = np.concatenate([[0], np.cumsum(counts)]).astype(np.int64)
+            # A stable sort keeps each code's jobs in ascending index order
+            order = np.argsort(codes, kind='stable').astype(np.int32)
+            self.feature_postings[feature] = (order, offsets)
+        
+        self.feature_bitmaps = self._feature_bitmaps()
+        
+        counts = np.bincount(self.location_codes, minlength=len(self.location_values))
+        self.location_postings = (np.argsort(self.location_codes, kind='stable').astype(np.int32),
+                                  np.concatenate([[0], np.cumsum(counts)]).astype(np.int64))
+    
+    def _feature_bitmaps(self):
+        """Packed bitmap per code of each filter feature, one bit per job"""
+        return {
+            feature: np.packbits(
+                self.feature_codes[feature][np.newaxis, :] ==
+                np.arange(len(self.feature_encoders[feature].classes_))[:, np.newaxis], axis=1
+            )
+            for feature in FILTER_FEATURES
+        }
+    
+    def _build_location_tree(self):
+        """Spatial index over the distinct job locations that could be geocoded"""
+        self.location_tree_codes = np.flatnonzero(~np.isnan(self.location_coords[:, 0]))
+        self.location_tree = None
+        if len(self.location_tree_codes):
+            self.location_tree = cKDTree(_unit_vectors(self.location_coords[self.location_tree_codes]))
+    
+    def jobs_within_km(self, location, km):
+        """Sorted indices of jobs within km of a location, or None if it can't be geocoded"""
+        coords = self.gazetteer.geocode(location)
+        if coords is None:
+            return None
+        
+        jobs = []
+        if self.location_tree is not None:
+            points = self.location_tree.query_ball_point(_unit_vectors(np.array([coords]))[0], _chord_length(km))
+            order, offsets = self.location_postings
+            jobs = [order[offsets[code]:offsets[code + 1]] for code in self.location_tree_codes[points]]
+        nearby = np.sort(np.concatenate(jobs)) if jobs else np.array([], dtype=np.int32)
+        
+        # Appended jobs aren't in the spatial index; there are few enough to check directly
+        appended = self.location_codes[self.n_artifact_jobs:]
+        if len(appended):
+            with np.errstate(invalid='ignore'):
+                close = _haversine_km(coords, self.location_coords[appended]) <= km
+            nearby = np.concatenate([nearby, self.n_artifact_jobs + np.flatnonzero(close)])
+        return nearby
+    
+    def _build_collaborative_features(self):
+        """Encode categorical job features as compact integer code arrays"""
+        for feature, encoder in self.feature_encoders.items():
+            codes = encoder.transform(self.df[feature]).astype(np.int8)
+            self.feature_codes[feature] = codes
+            # Keep the display column as a categorical view over the same codes
+            self.df[feature] = pd.Categorical.from_codes(codes, encoder.classes_)
+    
+    def _encode_feature(self, feature, value):
+        """Get the integer code of a feature value, or -1 if it is unknown"""
+        classes = self.feature_encoders[feature].classes_
+        matches = np.flatnonzero(classes == value)
+        return matches[0] if len(matches) else -1
+    
+    def recommend_career_path(self, user_profile, serialized=False, top_k=None):
+        """Generate comprehensive career path recommendations, as JSON bytes if serialized.
+        
+        Up to three jobs in the user's location and two elsewhere are recommended,
+        or with top_k the top_k best jobs, those in the user's location first.
+        """
+        return self._assemble_recommendations(user_profile, self._cached_shortlist(user_profile, top_k),
+                                              serialized, top_k)
+    
+    def _assemble_recommendations(self, user_profile, shortlist, serialized=False, top_k=None):
+        """The response for a profile from its shortlist"""
+        jobs, scores, kept = shortlist
+        with self._timed('final'):
+            if serialized:
+                return self._serialize_final_recommendations(scores, user_profile, np.arange(len(jobs)), jobs, kept,
+                                                             limit=top_k)
+            recommendations = self._generate_final_recommendations(scores, user_profile, np.arange(len(jobs)), jobs,
+                                                                   limit=top_k)
+        recommendations['pipeline'] = kept
         return recommendations
     
-    def _content_based_recommendation(self, user_profile):
-        """Content-based recommendations using TF-IDF"""
-        user_query = f"{user_profile['primary_interest']} {user_profile['aptitude_areas']} {user_profile['career_goal']}"
-        user_vector = self.tfidf.transform([user_query])
-        similarity_scores = cosine_similarity(user_vector, self.tfidf_matrix).flatten()
-        return similarity_scores
+    def _cached_shortlist(self, user_profile, top_k=None):
+        """The _score_shortlist of a profile, long enough for top_k, from the score cache"""
+        # Profiles that score alike share one shortlist; the response is still
+        # assembled from this profile, since it echoes e.g. the exact location
+        size = max(self.pipeline['top_k'], top_k or 0)
+        key = (self._score_cache_key(user_profile), size)
+        shortlist = self.score_cache.get(self.model_version, key)
+        if shortlist is None:
+            shortlist = self._score_shortlist(user_profile, size)
+            self.score_cache.put(self.model_version, key, shortlist)
+        return shortlist
+    
+    @property
+    def model_version(self):
+        """Identifies the data and build of the model currently loaded, the job changes
+        applied and the collaborative factors"""
+        return (self.data_hash, self.model_built_at, self.changes_offset, self.als_trained_at)
+    
+    def _score_cache_key(self, user_profile):
+        """Normalized projection of the profile fields that affect scoring"""
+        def text(value):
+            # The vectorizer lowercases and tokenizes, so case and spacing don't matter
+            return ' '.join(str(value).lower().split())
+        
+        user_features = self._user_features(user_profile)
+        max_distance_km = user_profile.get('max_distance_km')
+        filters = user_profile.get('filters') or {}
+        return (
+            user_profile['primary_interest'],
+            text(user_profile['aptitude_areas']),
+            text(user_profile['career_goal']),
+            user_features['location_cluster'],
+            user_features['experience_level'],
+            user_features['work_type'],
+            # Barrier adjustments multiply, so their order doesn't matter
+            tuple(sorted(user_profile['barriers'])),
+            self.education_levels.get(user_profile['education'], 3),
+            # A distance filter depends on where exactly the user is
+            max_distance_km,
+            self.gazetteer.geocode(user_profile['location']) if max_distance_km else None,
+            json.dumps(filters, sort_keys=True),
+            # Users with application history are scored on their own factors
+            user_profile.get('user_id') if self._user_factor(user_profile) is not None else None
+        )
+    
+    def _score_shortlist(self, user_profile, top_k=None, user_vector=None, shared=None):
+        """Rank jobs for a profile through the cascade of DEFAULT_PIPELINE stages.
+        
+        Returns the top job indices (top_k of them, by default the pipeline's),
+        their blended scores (best first) and the number of candidates each
+        stage kept. A batch passes the profile's TF-IDF query vector, and a
+        shared dict in which scores that depend on only a few profile fields
+        are kept for the other profiles of the batch.
+        """
+        top_k = top_k or self.pipeline['top_k']
+        kept = {}
+        
+        # Retrieval: hard filters and the inverted index; TF-IDF scores come
+        # with the lexical candidates, other content scores are left for later
+        with self._timed('retrieve'):
+            allowed = self._allowed_jobs(user_profile, shared)
+            if allowed is not None and len(allowed) <= MAX_DIRECT_FILTERED_JOBS:
+                # Heavily filtered: the jobs that passed the filters are the candidates
+                candidates, content_scores = allowed, None
+            else:
+                candidates, content_scores = self._retrieve_candidates(user_profile, user_vector)
+                if allowed is not None:
+                    candidates, content_scores = self._restrict_candidates(candidates, content_scores, allowed)
+                candidates, content_scores = self._drop_removed(candidates, content_scores)
+        kept['retrieve'] = self.n_jobs if candidates is None else len(candidates)
+        
+        if kept['retrieve']:
+            # Collaborative filtering based on similar profiles
+            with self._timed('collaborative'):
+                collaborative_scores = self._collaborative_filtering(user_profile, candidates, shared)
+            
+            # Knowledge-based filtering for constraints
+            with self._timed('constraint'):
+                constraint_scores = self._knowledge_based_filtering(user_profile, candidates, shared)
+            
+            # Prune on the cheap signals before any further content scoring
+            with self._timed('prefilter'):
+                if kept['retrieve'] > self.pipeline['prefilter_size']:
+                    weights = self.pipeline['weights']
+                    cheap_scores = (weights['collaborative'] * self._normalize_scores(collaborative_scores) +
+                                    weights['constraint'] * self._normalize_scores(constraint_scores))
+                    survivors = np.sort(self._top_indices(cheap_scores, self.pipeline['prefilter_size']))
+                    candidates = survivors if candidates is None else candidates[survivors]
+                    collaborative_scores = collaborative_scores[survivors]
+                    constraint_scores = constraint_scores[survivors]
+                    if content_scores is not None:
+                        content_scores = content_scores[survivors]
+            kept['prefilter'] = self.n_jobs if candidates is None else len(candidates)
+            
+            # Content similarity for the survivors that retrieval didn't score
+            with self._timed('content'):
+                if content_scores is None:
+                    content_scores = self._content_based_recommendation(user_profile, candidates, user_vector)
+            
+            # Hybrid scoring
+            with self._timed('hybrid'):
+                final_scores = self._hybrid_scoring(content_scores, collaborative_scores, constraint_scores,
+                                                    user_profile)
+                top_indices = self._top_indices(final_scores, top_k)
+            jobs = top_indices if candidates is None else candidates[top_indices]
+            top_scores = final_scores[top_indices]
+        else:
+            kept['prefilter'] = 0
+            jobs, top_scores = np.array([], dtype=np.intp), np.array([])
+        kept['top_k'] = len(jobs)
+        
+        for stage, count in kept.items():
+            self.pipeline_kept.setdefault(stage, _Histogram(CANDIDATE_BUCKETS)).observe(count)
+        return jobs, top_scores, kept
+    
+    def recommend_career_paths(self, user_profiles, top_k=None, serialized=False):
+        """Recommendations for many profiles, each ranked and assembled exactly as
+        recommend_career_path would (sharing its score cache).
+        
+        Profiles that score alike are ranked once. The rest are ranked together:
+        their queries are vectorized in one pass, and their filters and their
+        collaborative and constraint scores are worked out once per group of
+        profiles that share the fields they depend on.
+        """
+        size = max(self.pipeline['top_k'], top_k or 0)
+        version = self.model_version
+        keys = [(self._score_cache_key(user_profile), size) for user_profile in user_profiles]
+        shortlists, unscored = {}, {}
+        for key, user_profile in zip(keys, user_profiles):
+            if key in shortlists or key in unscored:
+                continue
+            shortlist = self.score_cache.get(version, key)
+            if shortlist is None:
+                unscored[key] = user_profile
+            else:
+                shortlists[key] = shortlist
+        
+        if unscored:
+            user_vectors = self.tfidf.transform([self._user_query(p) for p in unscored.values()])
+            shared = {}
+            for row, (key, user_profile) in enumerate(unscored.items()):
+                shortlists[key] = self._score_shortlist(user_profile, size, user_vectors[row], shared)
+                self.score_cache.put(version, key, shortlists[key])
+        
+        return [self._assemble_recommendations(user_profile, shortlists[key], serialized, top_k)
+                for key, user_profile in zip(keys, user_profiles)]
+    
+    def _user_query(self, user_profile):
+        """Build the free-text query used for content-based filtering; regional-language
+        words known to the term table are followed by their English terms, and other
+        regional-script words by the job words spelled like them"""
+        query = f"{user_profile['primary_interest']} {user_profile['aptitude_areas']} {user_profile['career_goal']}"
+        terms, unmatched = self.lexicon.match(query)
+        regional = [word for word in unmatched if _BRAHMIC_RE.search(word)]
+        return ' '.join([query] + terms + self._spelled_like(regional))
+    
+    def _spelled_like(self, words):
+        """For each word, the word of the job titles and skills nearest it in character
+        n-grams, if it is at least REGIONAL_MIN_SIMILARITY similar"""
+        if not words or not self.char_words:
+            return []
+        similarity = (self.char_tfidf.transform(words) @ self.char_matrix.T).toarray()
+        nearest = similarity.argmax(axis=1)
+        return [self.char_words[col] for row, col in enumerate(nearest)
+                if similarity[row, col] >= REGIONAL_MIN_SIMILARITY]
+    
+    def _content_based_recommendation(self, user_profile, jobs=None, user_vector=None):
+        """Content-based scores of every job (or the given jobs) using the configured engine"""
+        if user_vector is None:
+            user_vector = self.tfidf.transform([self._user_query(user_profile)])
+        return self._content_scores(user_vector, jobs)[0]
+    
+    def _content_scores(self, user_vectors, jobs=None):
+        """Content scores of every job (or the given jobs) for a batch of TF-IDF query vectors"""
+        if self.content_engine == 'lsa':
+            # Project queries into the LSA space; job embeddings are unit length
+            queries = normalize(user_vectors @ self.lsa_components.T).astype(np.float32)
+            return self._score_rows(lambda rows: (rows @ queries.T).T,
+                                    self.lsa_embeddings, self.appended_embeddings, jobs)
+        
+        # TF-IDF rows are L2-normalized, so the dot product is the cosine similarity
+        return self._score_rows(lambda rows: (user_vectors @ rows.T).toarray(),
+                                self.tfidf_matrix, self.appended_matrix, jobs)
+    
+    def _score_rows(self, score, rows, appended_rows, jobs=None):
+        """Apply score to the rows of the given jobs (or every job), split between the
+        artifact's rows and the rows of jobs appended since"""
+        if appended_rows is None:
+            return score(rows if jobs is None else rows[jobs])
+        if jobs is None:
+            return np.hstack([score(rows), score(appended_rows)])
+        
+        jobs = np.asarray(jobs)
+        in_artifact = jobs < self.n_artifact_jobs
+        parts = [score(rows[jobs[in_artifact]]), score(appended_rows[jobs[~in_artifact] - self.n_artifact_jobs])]
+        scores = np.empty((parts[0].shape[0], len(jobs)), dtype=np.result_type(*parts))
+        scores[:, in_artifact], scores[:, ~in_artifact] = parts
+        return scores
+    
+    def _location_shard(self, user_profile):
+        """Location cluster code whose jobs to search first, or None to search every job"""
+        cluster = self._get_location_cluster(user_profile['location'])
+        # Remote seekers aren't tied to a place, and 'other' is no one place.
+        # Users with a transport barrier are ranked up on remote jobs, which
+        # can be anywhere, so they aren't sharded either
+        if (cluster == 'other' or user_profile['preferred_work_type'] == 'remote' or
+                'transport' in user_profile['barriers']):
+            return None
+        return self._encode_feature('location_cluster', cluster)
+    
+    def _jobs_with_code(self, feature, code):
+        """Ascending indices of the jobs with the given code of an indexed feature"""
+        order, offsets = self.feature_postings[feature]
+        jobs = order[offsets[code]:offsets[code + 1]]
+        appended = self.feature_codes[feature][self.n_artifact_jobs:]
+        if len(appended):
+            jobs = np.concatenate([jobs, self.n_artifact_jobs + np.flatnonzero(appended == code)])
+        return jobs
+    
+    def _retrieve_candidates(self, user_profile, user_vector=None):
+        """Select candidate jobs for a profile, with TF-IDF scores when they come for free.
+        
+        The user's location shard is searched first; the rest of the corpus is
+        only searched when the shard has too few matches. Candidates are None
+        for every job, and content scores None when the engine scores later.
+        """
+        shard = self._location_shard(user_profile)
+        
+        if self.content_engine == 'lsa':
+            # The dense engine has no lexical pruning; every job in scope is a candidate
+            if shard is not None:
+                local = self._jobs_with_code('location_cluster', shard)
+                if len(local) >= MIN_LOCAL_CANDIDATES:
+                    return local, None
+            return None, None
+        
+        if user_vector is None:
+            user_vector = self.tfidf.transform([self._user_query(user_profile)])
+        if shard is not None:
+            candidates, content_scores = self._lexical_candidates(user_vector, shard)
+            if len(candidates) >= MIN_LOCAL_CANDIDATES:
+                return candidates, content_scores
+        
+        candidates, content_scores = self._lexical_candidates(user_vector)
+        if len(candidates) < MIN_CANDIDATES:
+            # Too little lexical overlap: add jobs in the user's location cluster
+            # or skill category, which score zero on content
+            user_features = self._user_features(user_profile)
+            fallback = [candidates]
+            for feature in self.feature_postings:
+                code = self._encode_feature(feature, user_features[feature])
+                if code >= 0:
+                    fallback.append(self._jobs_with_code(feature, code))
+            merged = np.unique(np.concatenate(fallback)) if len(fallback) > 1 else candidates
+            if len(merged) == 0:
+                merged = np.arange(self.n_jobs)
+            merged_scores = np.zeros(len(merged))
+            merged_scores[np.searchsorted(merged, candidates)] = content_scores
+            candidates, content_scores = merged, merged_scores
+        
+        return candidates, content_scores
     
-    def _collaborative_filtering(self, user_profile):
-        """Collaborative filtering based on similar user profiles"""
-        user_features = {
+    def _allowed_jobs(self, user_profile, shared=None):
+        """Sorted indices of the jobs passing the profile's hard filters, or None if it has none"""
+        if shared is not None and (user_profile.get('filters') or user_profile.get('max_distance_km')):
+            max_distance_km = user_profile.get('max_distance_km')
+            key = ('allowed', json.dumps(user_profile.get('filters') or {}, sort_keys=True), max_distance_km,
+                   self.gazetteer.geocode(user_profile['location']) if max_distance_km else None)
+            if key not in shared:
+                shared[key] = self._allowed_jobs(user_profile)
+            return shared[key]
+        
+        allowed = None
+        filters = user_profile.get('filters')
+        if filters:
+            # The artifact's jobs are matched on packed bitmaps, appended jobs directly
+            mask, appended = None, np.ones(self.n_jobs - self.n_artifact_jobs, dtype=bool)
+            for feature, values in filters.items():
+                if feature in RANGE_FILTERS:
+                    # The job's [low, high] range must overlap the requested one
+                    parts = []
+                    for low, high in zip(*(self._segments(self.job_attributes[name])
+                                           for name in RANGE_FILTERS[feature])):
+                        matches = np.ones(len(low), dtype=bool)
+                        if values.get('min') is not None:
+                            matches &= high >= values['min']
+                        if values.get('max') is not None:
+                            matches &= low <= values['max']
+                        parts.append(matches)
+                    clause, appended_clause = np.packbits(parts[0]), parts[1]
+                else:
+                    codes = [code for code in (self._encode_feature(feature, v) for v in values) if code >= 0]
+                    # Values of one feature are alternatives (OR); all features must hold (AND)
+                    clause = np.bitwise_or.reduce(self.feature_bitmaps[feature][codes], axis=0)
+                    appended_clause = np.isin(self._segments(self.feature_codes[feature])[1], codes)
+                mask = clause if mask is None else mask & clause
+                appended &= appended_clause
+            allowed = np.concatenate([np.flatnonzero(np.unpackbits(mask, count=self.n_artifact_jobs)),
+                                      self.n_artifact_jobs + np.flatnonzero(appended)])
+        
+        if user_profile.get('max_distance_km'):
+            # prepare_user_profile only lets the distance filter through for known locations
+            nearby = self.jobs_within_km(user_profile['location'], user_profile['max_distance_km'])
+            allowed = nearby if allowed is None else np.intersect1d(allowed, nearby, assume_unique=True)
+        
+        if allowed is not None and self.removed is not None:
+            allowed = np.setdiff1d(allowed, self.removed, assume_unique=True)
+        return allowed
+    
+    def _segments(self, values):
+        """The artifact's jobs' and the appended jobs' parts of a per-job array"""
+        if isinstance(values, _ExtendedArray):
+            return values.array, values.rows
+        return values, values[len(values):]
+    
+    def _drop_removed(self, candidates, content_scores):
+        """Drop tombstoned jobs from the candidates (None for every job)"""
+        if self.removed is None:
+            return candidates, content_scores
+        if candidates is None:
+            live = np.setdiff1d(np.arange(self.n_jobs), self.removed, assume_unique=True)
+            return live, None if content_scores is None else content_scores[live]
+        keep = ~np.isin(candidates, self.removed)
+        return candidates[keep], None if content_scores is None else content_scores[keep]
+    
+    def _restrict_candidates(self, candidates, content_scores, allowed):
+        """Keep only the candidates among the allowed jobs"""
+        if candidates is None:
+            return allowed, None if content_scores is None else content_scores[allowed]
+        
+        keep = np.isin(candidates, allowed, assume_unique=True)
+        if keep.sum() < MIN_CANDIDATES:
+            # Few lexical matches passed the filters: every allowed job is a candidate
+            return allowed, None
+        return candidates[keep], None if content_scores is None else content_scores[keep]
+    
+    def _lexical_candidates(self, user_vector, shard=None):
+        """Jobs sharing a query term with the user, within a location cluster shard if given,
+        with TF-IDF scores"""
+        indptr, rows = self.term_postings.indptr, self.term_postings.indices
+        shard_order, shard_offsets = self.feature_postings['location_cluster']
+        segments = []
+        for term, weight in zip(user_vector.indices, user_vector.data):
+            start, end = indptr[term], indptr[term + 1]
+            if shard is not None:
+                # Postings are sorted by row, so the shard is one contiguous run
+                start, end = start + np.searchsorted(rows[start:end], shard_offsets[shard:shard + 2])
+            segments.append((start, end, weight))
+        
+        jobs, weights = [], []
+        if segments:
+            jobs.append(shard_order[np.concatenate([rows[start:end] for start, end, _ in segments])])
+            weights.append(np.concatenate([self.term_postings.data[start:end] * w for start, end, w in segments]))
+        if self.appended_matrix is not None:
+            # Appended jobs aren't in the inverted index; there are few enough to score directly
+            appended_scores = (user_vector @ self.appended_matrix.T).toarray()[0]
+            matched = np.flatnonzero(appended_scores)
+            if shard is not None:
+                matched = matched[self.feature_codes['location_cluster'][self.n_artifact_jobs + matched] == shard]
+            jobs.append(self.n_artifact_jobs + matched)
+            weights.append(appended_scores[matched])
+        
+        if not jobs:
+            return np.array([], dtype=np.intp), np.array([])
+        # Summed over every job rather than over the unique matches, which would take
+        # a sort; matched jobs score above zero since TF-IDF weights are positive
+        scores = np.bincount(np.concatenate(jobs), weights=np.concatenate(weights), minlength=self.n_jobs)
+        candidates = np.flatnonzero(scores)
+        return candidates, scores[candidates]
+    
+    def _user_features(self, user_profile):
+        """Categorical features of a user, comparable with the job features"""
+        return {
             'skill_category': user_profile['primary_interest'],
             'location_cluster': self._get_location_cluster(user_profile['location']),
             'experience_level': self._get_experience_level(user_profile['experience_years']),
             'work_type': user_profile['preferred_work_type'] if user_profile['preferred_work_type'] != 'any' else 'onsite'
         }
+    
+    def _user_factor(self, user_profile):
+        """Learned factors of the user, or None for users without application history"""
+        row = self.user_factor_rows.get(user_profile.get('user_id'))
+        return None if row is None else self.user_factors[row]
+    
+    def _factor_scores(self, user_factors, jobs=None):
+        """Learned affinity of users to every job (or the given jobs); 0 for jobs nobody applied to"""
+        rows = np.asarray(self.job_factor_rows) if jobs is None else self.job_factor_rows[jobs]
+        scores = np.zeros((len(user_factors), len(rows)), dtype=np.float32)
+        known = rows >= 0
+        scores[:, known] = user_factors @ self.job_factors[rows[known]].T
+        return scores
+    
+    def _collaborative_filtering(self, user_profile, candidates=None, shared=None):
+        """Collaborative filtering: learned affinities for users with application history,
+        else based on similar user profiles"""
+        user_factor = self._user_factor(user_profile)
+        if user_factor is not None:
+            return self._factor_scores(user_factor[np.newaxis, :], candidates)[0]
         
-        similarity_scores = []
-        for _, row in self.feature_df.iterrows():
-            score = 0
-            if row['skill_category'] == user_features['skill_category']:
-                score += 0.4
-            if row['location_cluster'] == user_features['location_cluster']:
-                score += 0.3
-            if row['experience_level'] == user_features['experience_level']:
-                score += 0.2
-            if row['work_type'] == user_features['work_type']:
-                score += 0.1
-            
-            similarity_scores.append(score)
+        user_features = self._user_features(user_profile)
+        codes = {feature: self._encode_feature(feature, user_features[feature])
+                 for feature in self.collaborative_weights}
+        if shared is not None:
+            # Scored over every job once for all profiles with these features
+            key = ('collaborative',) + tuple(codes.values())
+            if key not in shared:
+                shared[key] = self._collaborative_filtering(user_profile)
+            return shared[key] if candidates is None else shared[key][candidates]
         
-        return np.array(similarity_scores)
+        similarity_scores = np.zeros(self.n_jobs if candidates is None else len(candidates))
+        for feature, weight in self.collaborative_weights.items():
+            code = codes[feature]
+            job_codes = self.feature_codes[feature]
+            job_codes = np.asarray(job_codes) if candidates is None else job_codes[candidates]
+            similarity_scores += weight * (job_codes == code)
+        
+        return similarity_scores
     
-    def _knowledge_based_filtering(self, user_profile):
+    def _knowledge_based_filtering(self, user_profile, candidates=None, shared=None):
         """Knowledge-based filtering for constraints and barriers"""
-        constraint_scores = np.ones(len(self.df))
+        if shared is not None:
+            # Scored over every job once for all profiles with these barriers and education
+            key = ('constraint', tuple(user_profile['barriers']), self.education_levels.get(user_profile['education'], 3))
+            if key not in shared:
+                shared[key] = self._knowledge_based_filtering(user_profile)
+            return shared[key] if candidates is None else shared[key][candidates]
+        
+        features = np.asarray(self.constraint_features) if candidates is None else self.constraint_features[candidates]
+        constraint_scores = np.ones(len(features))
+        
+        def column(keyword):
+            return features[:, self.constraint_keywords.index(keyword)]
         
         for barrier in user_profile['barriers']:
             if barrier in self.barrier_impact:
-                preferred_types = self.barrier_impact[barrier]
-                for i, row in self.df.iterrows():
-                    job_text = row['combined_text'].lower()
-                    
-                    if any(pref_type in job_text for pref_type in preferred_types):
-                        constraint_scores[i] *= 1.5
-                    
-                    if barrier == 'transport' and 'onsite' in job_text and 'remote' not in job_text:
-                        constraint_scores[i] *= 0.7
-                    elif barrier == 'childcare' and 'full_time' in job_text and 'flexible' not in job_text:
-                        constraint_scores[i] *= 0.8
+                cols = [self.constraint_keywords.index(kw) for kw in self.barrier_impact[barrier]]
+                preferred = features[:, cols].any(axis=1)
+                constraint_scores[preferred] *= 1.5
+                
+                if barrier == 'transport':
+                    constraint_scores[column('onsite') & ~column('remote')] *= 0.7
+                elif barrier == 'childcare':
+                    constraint_scores[column('full_time') & ~column('flexible')] *= 0.8
         
         user_edu_level = self.education_levels.get(user_profile['education'], 3)
-        for i, row in self.df.iterrows():
-            job_text = row['combined_text'].lower()
-            
-            if 'graduate' in job_text and user_edu_level < 5:
-                constraint_scores[i] *= 0.6
-            elif 'postgraduate' in job_text and user_edu_level < 6:
-                constraint_scores[i] *= 0.4
-            elif '10th' in job_text and user_edu_level >= 2:
-                constraint_scores[i] *= 1.2
+        graduate = column('graduate') & (user_edu_level < 5)
+        postgraduate = column('postgraduate') & (user_edu_level < 6)
+        tenth = column('10th') & (user_edu_level >= 2)
+        constraint_scores *= np.select([graduate, postgraduate, tenth], [0.6, 0.4, 1.2], default=1.0)
         
         return constraint_scores
     
+    def _normalize_scores(self, scores):
+        """Min-max normalize scores per profile (along the last axis)"""
+        low = scores.min(axis=-1, keepdims=True)
+        high = scores.max(axis=-1, keepdims=True)
+        return (scores - low) / (high - low + 1e-8)
+    
     def _hybrid_scoring(self, content_scores, collaborative_scores, constraint_scores, user_profile):
         """Combine all scoring methods"""
-        content_scores = (content_scores - content_scores.min()) / (content_scores.max() - content_scores.min() + 1e-8)
-        collaborative_scores = (collaborative_scores - collaborative_scores.min()) / (collaborative_scores.max() - collaborative_scores.min() + 1e-8)
-        constraint_scores = (constraint_scores - constraint_scores.min()) / (constraint_scores.max() - constraint_scores.min() + 1e-8)
+        content_scores = self._normalize_scores(content_scores)
+        collaborative_scores = self._normalize_scores(collaborative_scores)
+        constraint_scores = self._normalize_scores(constraint_scores)
         
-        weights = {'content': 0.4, 'collaborative': 0.3, 'constraint': 0.3}
+        weights = self.pipeline['weights']
         
         final_scores = (
             weights['content'] * content_scores +
@@ -307,54 +2098,125 @@ class CareerPathRecommender:
         
         return final_scores
     
-    def _generate_final_recommendations(self, scores, user_profile):
-        """Generate final career path recommendations"""
-        top_indices = np.argsort(scores)[::-1][:10]
-        
-        recommendations = {
-            'primary_recommendations': [],
-            'learning_path': [],
-            'mentorship_suggestions': [],
-            'barrier_solutions': []
-        }
-        
-        location_matches = []
-        general_matches = []
+    def _top_indices(self, scores, k):
+        """Indices of the k highest scores, best first"""
+        k = min(k, len(scores))
+        if k <= 0:
+            return np.array([], dtype=np.intp)
+        top = np.argpartition(-scores, k - 1)[:k]
+        return top[np.argsort(-scores[top], kind='stable')]
+    
+    def _pick_recommendations(self, scores, user_profile, top_indices=None, candidates=None, limit=None):
+        """The jobs to recommend, up to three in the user's location then two elsewhere
+        (or the limit best, local ones first), as (job index, display fields, match
+        score, reasoning)"""
+        if top_indices is None:
+            top_indices = self._top_indices(scores, max(10, limit or 0))
+        # Scores may cover only a candidate subset; map back to job indices
+        jobs = top_indices if candidates is None else candidates[top_indices]
+        top_scores = scores[top_indices]
         
-        for idx in top_indices:
-            job_data = self.df.iloc[idx]
-            score = scores[idx]
-            
-            rec = {
-                'job_title': job_data['job_title'],
-                'location': job_data['location'],
-                'skills_required': job_data['skills'],
-                'match_score': round(score * 100, 1),
-                'work_type': job_data['work_type'],
-                'experience_level': job_data['experience_level'],
-                'reasoning': self._generate_reasoning(job_data, user_profile, score)
-            }
-            
-            if user_profile['location'].lower() in job_data['location'].lower():
-                location_matches.append(rec)
-            else:
-                general_matches.append(rec)
+        location_match = self._location_match_mask(jobs, user_profile['location'])
+        if limit is None:
+            picked = np.concatenate([np.flatnonzero(location_match)[:3],
+                                     np.flatnonzero(~location_match)[:2]]).astype(np.intp)
+        else:
+            best = np.arange(min(limit, len(jobs)))
+            picked = np.concatenate([best[location_match[best]], best[~location_match[best]]])
         
-        recommendations['primary_recommendations'] = location_matches[:3] + general_matches[:2]
-        recommendations['learning_path'] = self._generate_learning_path(user_profile)
-        recommendations['mentorship_suggestions'] = self._generate_mentorship_suggestions(user_profile)
-        recommendations['barrier_solutions'] = self._generate_barrier_solutions(user_profile)
+        match_scores = np.round(top_scores[picked] * 100, 1).tolist()
+        return [
+            (job, job_data, match_score, self._generate_reasoning(job_data, user_profile, score, local))
+            for job, job_data, match_score, score, local in zip(
+                jobs[picked].tolist(), self._job_records(jobs[picked]), match_scores, top_scores[picked],
+                location_match[picked])
+        ]
+    
+    def _generate_final_recommendations(self, scores, user_profile, top_indices=None, candidates=None,
+                                        limit=None):
+        """Generate final career path recommendations"""
+        return {
+            'primary_recommendations': [
+                {
+                    'job_title': job_data['job_title'],
+                    'location': job_data['location'],
+                    'skills_required': job_data['skills'],
+                    'match_score': match_score,
+                    'work_type': job_data['work_type'],
+                    'experience_level': job_data['experience_level'],
+                    'reasoning': reasoning
+                }
+                for _, job_data, match_score, reasoning in self._pick_recommendations(
+                    scores, user_profile, top_indices, candidates, limit)
+            ],
+            'learning_path': self._generate_learning_path(user_profile),
+            'mentorship_suggestions': self._generate_mentorship_suggestions(user_profile),
+            'barrier_solutions': self._generate_barrier_solutions(user_profile)
+        }
+    
+    def _serialize_final_recommendations(self, scores, user_profile, top_indices=None, candidates=None,
+                                         pipeline=None, limit=None):
+        """The recommendations of _generate_final_recommendations (plus the pipeline stage
+        counts, if given) as JSON bytes, assembled from the serialized job cards and blocks"""
+        cards = [
+            b'{%s,"match_score":%s,"reasoning":%s}' % (self.job_cards.raw(job), _dumps(match_score), _dumps(reasoning))
+            for job, _, match_score, reasoning in self._pick_recommendations(scores, user_profile, top_indices,
+                                                                             candidates, limit)
+        ]
+        interest_blocks = self.interest_blocks.get(user_profile['primary_interest'])
+        if interest_blocks is None:
+            interest_blocks = (_dumps(self._generate_learning_path(user_profile)),
+                               _dumps(self._generate_mentorship_suggestions(user_profile)))
+        barrier_blocks = [block for barrier in user_profile['barriers']
+                          for block in self.barrier_blocks.get(barrier, [])]
         
-        return recommendations
+        parts = [b'{"primary_recommendations":[', b','.join(cards),
+                 b'],"learning_path":', interest_blocks[0],
+                 b',"mentorship_suggestions":', interest_blocks[1],
+                 b',"barrier_solutions":[', b','.join(barrier_blocks), b']']
+        if pipeline is not None:
+            parts += [b',"pipeline":', _dumps(pipeline)]
+        parts.append(b'}')
+        return b''.join(parts)
     
-    def _generate_reasoning(self, job_data, user_profile, score):
+    def _location_match_mask(self, jobs, location):
+        """Whether each job is within NEARBY_KM of the user's location or names it"""
+        codes = self.location_codes[jobs]
+        named = np.char.find(self.location_values[codes], location.lower()) >= 0
+        coords = self.gazetteer.geocode(location)
+        if coords is None:
+            return named
+        with np.errstate(invalid='ignore'):
+            # Jobs whose location wasn't geocoded have NaN distances, which never match
+            nearby = _haversine_km(coords, self.location_coords[codes]) <= NEARBY_KM
+        return named | nearby
+    
+    def _job_cards(self, df):
+        """Serialized fixed fields of the recommendation card of each job in df"""
+        return [
+            # The braces are left off so per-request fields can be appended
+            _dumps({'job_title': title, 'location': location, 'skills_required': skills,
+                    'work_type': work_type, 'experience_level': experience_level})[1:-1]
+            for title, location, skills, work_type, experience_level in zip(
+                df['job_title'], df['location'], df['skills'], df['work_type'], df['experience_level'])
+        ]
+    
+    def _job_records(self, jobs):
+        """Get the display fields of the given jobs, gathered column by column"""
+        columns = {col: [column[idx] for idx in jobs] for col, column in self.job_columns.items()}
+        columns['location'] = self.location_values[self.location_codes[jobs]].tolist()
+        for feature in ('work_type', 'experience_level'):
+            columns[feature] = self.feature_encoders[feature].classes_[self.feature_codes[feature][jobs]].tolist()
+        return [dict(zip(columns, values)) for values in zip(*columns.values())]
+    
+    def _generate_reasoning(self, job_data, user_profile, score, local):
         """Generate reasoning for why a job was recommended"""
         reasons = []
         
         if user_profile['primary_interest'] in job_data['combined_text']:
             reasons.append(f"matches your {user_profile['primary_interest']} interest")
         
-        if user_profile['location'].lower() in job_data['location'].lower():
+        if local:
             reasons.append("available in your location")
         
         if job_data['experience_level'] == self._get_experience_level(user_profile['experience_years']):
@@ -443,10 +2305,16 @@ class CareerPathRecommender:
         return solutions
     
     def _get_location_cluster(self, location):
-        """Get location cluster for a given location"""
+        """Get location cluster for a given location: the major city it lies near, else 'other'"""
+        coords = self.gazetteer.geocode(location)
+        if coords is not None:
+            distances = np.nan_to_num(_haversine_km(coords, self.metro_coords), nan=np.inf)
+            nearest = distances.argmin()
+            return self.major_cities[nearest] if distances[nearest] <= METRO_RADIUS_KM else 'other'
+        
+        # Places missing from the gazetteer may still name a major city
         location = location.lower()
-        major_cities = ['mumbai', 'delhi', 'bangalore', 'chennai', 'kolkata', 'pune', 'hyderabad']
-        return next((city for city in major_cities if city in location), 'other')
+        return next((city for city in self.major_cities if city in location), 'other')
     
     def _get_experience_level(self, years):
         """Convert years to experience level"""
@@ -457,20 +2325,288 @@ class CareerPathRecommender:
         else:
             return 'senior'
 
+def _build_model_artifact(csv_file, artifact_dir, content_engine, progress, rebuild=False):
+    """Build and save a model artifact in a worker process, reporting each phase"""
+    builder = CareerPathRecommender(csv_file, artifact_dir, content_engine)
+    builder.progress_callback = lambda phase, stats: progress.put(('phase', phase, stats))
+    if builder.load_and_preprocess_data(rebuild) and builder.build_recommendation_models() and builder.artifact_loaded:
+        progress.put(('done', None, None))
+    else:
+        progress.put(('error', 'Failed to build the model artifact', None))
+
+class ModelRebuilder:
+    """Rebuilds the recommender in the background and swaps it in atomically.
+    
+    The artifact is built in a separate process so scoring threads keep the
+    interpreter to themselves; the finished artifact is then memory-mapped
+    into a fresh CareerPathRecommender, which replaces the global one in a
+    single assignment. Requests in flight keep the snapshot they started with.
+    
+    Prefork workers don't build themselves: they ask the parent through
+    delegate, which builds once for all of them, and read the status the
+    parent publishes to status_file.
+    """
+    BUILD_PHASES = ['read_csv', 'extract_features', 'encode_features', 'fit_models', 'save_artifact']
+    
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.status = {'state': 'idle'}
+        # Called with no arguments after a rebuilt model has been swapped in
+        self.on_ready = None
+        # The build process while one runs
+        self.worker = None
+        # Called with rebuild to have another process build instead, and the
+        # file that process publishes its status to
+        self.delegate = None
+        self.status_file = None
+    
+    def start(self, rebuild=False):
+        """Start a rebuild unless one is already running; returns whether it started.
+        
+        rebuild forces a new artifact even if the current one matches the corpus,
+        which compacts the job change file into it.
+        """
+        # Nothing a build reads has changed, e.g. a page load re-requesting it. A
+        # delegating worker also checks the delegate's model, which a rebuild that
+        # found nothing new left in place without replacing the workers
+        if not rebuild and recommender.is_current(self.snapshot().get('sources')):
+            return False
+        if self.delegate is not None:
+            if self.snapshot()['state'] == 'building':
+                return False
+            # Reported until the delegate publishes its own status
+            self._write_status({'state': 'building', 'started_at': time.time(), 'phases': {}, 'progress': 0.0})
+            self.delegate(rebuild)
+            return True
+        
+        with self.lock:
+            if self.status['state'] == 'building':
+                return False
+            self.status = {'state': 'building', 'started_at': time.time(), 'phases': {}}
+        threading.Thread(target=self._run, args=(recommender, rebuild), daemon=True).start()
+        return True
+    
+    def snapshot(self):
+        """Current rebuild status, including the fraction of build phases done"""
+        if self.delegate is not None:
+            try:
+                with open(self.status_file) as f:
+                    return json.load(f)
+            except (OSError, ValueError):
+                return {'state': 'idle'}
+        
+        with self.lock:
+            status = dict(self.status, phases=dict(self.status.get('phases', {})))
+        if status['state'] == 'building':
+            status['progress'] = round(min(len(status['phases']) / len(self.BUILD_PHASES), 0.99), 2)
+        elif status['state'] == 'ready':
+            status['progress'] = 1.0
+        return status
+    
+    def publish(self):
+        """Write the current status to status_file for delegating processes to read"""
+        self._write_status(self.snapshot())
+    
+    def _write_status(self, status):
+        tmp_file = f'{self.status_file}.{os.getpid()}.tmp'
+        with open(tmp_file, 'w') as f:
+            json.dump(status, f)
+        os.replace(tmp_file, self.status_file)
+    
+    def stop(self):
+        """Terminate the build process, if one is running, e.g. on shutdown"""
+        with self.lock:
+            worker = self.worker
+        if worker is not None and worker.is_alive():
+            worker.terminate()
+            worker.join()
+    
+    def _run(self, current, rebuild):
+        global recommender
+        try:
+            context = multiprocessing.get_context('spawn')
+            progress = context.Queue()
+            # Not a daemon: daemonic processes can't have children, and the build
+            # spreads keyword matching over a process pool on large corpora.
+            # stop() terminates it instead when the server shuts down
+            worker = context.Process(
+                target=_build_model_artifact,
+                args=(current.csv_file, current.artifact_dir, current.content_engine, progress, rebuild)
+            )
+            with self.lock:
+                self.worker = worker
+            worker.start()
+            
+            while True:
+                try:
+                    kind, detail, stats = progress.get(timeout=1)
+                except queue.Empty:
+                    if worker.is_alive():
+                        continue
+                    raise RuntimeError('Model build process exited unexpectedly')
+                if kind == 'phase':
+                    with self.lock:
+                        self.status['phases'][detail] = stats
+                    current.phase_latency.setdefault(detail, _Histogram()).observe(stats['seconds'])
+                elif kind == 'error':
+                    raise RuntimeError(detail)
+                else:
+                    break
+            worker.join()
+            
+            # Load the finished artifact into a fresh snapshot, keeping the metrics
+            candidate = CareerPathRecommender(current.csv_file, current.artifact_dir, current.content_engine,
+                                              current.pipeline)
+            candidate.stage_latency = current.stage_latency
+            candidate.phase_latency = current.phase_latency
+            candidate.pipeline_kept = current.pipeline_kept
+            candidate.score_cache = current.score_cache
+            if not (candidate.load_and_preprocess_data() and candidate.build_recommendation_models()):
+                raise RuntimeError('Failed to load the rebuilt model')
+            
+            with model_swap_lock:
+                # Catch up on job changes recorded while the artifact was being built
+                candidate = candidate.with_job_changes()
+                # e.g. the corpus was touched but not edited: keep serving (and, under
+                # prefork, keep the workers) rather than swap in an identical model
+                changed = candidate.model_version != recommender.model_version
+                if changed:
+                    recommender = candidate
+                else:
+                    recommender.source_stamps = candidate.source_stamps
+            with self.lock:
+                self.status.update(state='ready', finished_at=time.time(), corpus_size=candidate.n_jobs,
+                                   sources=candidate.source_stamps)
+            if changed and self.on_ready is not None:
+                self.on_ready()
+        except Exception as e:
+            with self.lock:
+                self.status.update(state='failed', finished_at=time.time(), error=str(e))
+        finally:
+            with self.lock:
+                self.worker = None
+
+class JobChangeFeed:
+    """Applies the job change file to the serving model as jobs are posted and removed.
+    
+    Every CHANGE_POLL_SECONDS the lines appended to the change file are applied
+    to a snapshot of the serving model, which then replaces it; new jobs are
+    vectorized against the existing vocabulary, removed ones tombstoned. Once
+    enough changes pile up, a background rebuild compacts them into a fresh
+    artifact with refreshed IDF weights.
+    """
+    def __init__(self):
+        self.thread = None
+        # Whether this process starts compactions; one worker per prefork group does
+        self.auto_compact = True
+        self.compaction_requested_at = 0
+    
+    def start(self):
+        """Start polling the change file in the background"""
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._poll, daemon=True)
+            self.thread.start()
+    
+    def _poll(self):
+        while True:
+            time.sleep(CHANGE_POLL_SECONDS)
+            try:
+                self.apply()
+            except Exception as e:
+                print(f"Warning: could not apply job changes: {str(e)}")
+    
+    def record(self, job):
+        """Append a job document to the change file and apply it; returns the updated model"""
+        line = (json.dumps(job, ensure_ascii=False) + '\n').encode('utf-8')
+        fd = os.open(recommender.changes_file, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            # A single appending write, so lines from concurrent writers never interleave
+            os.write(fd, line)
+        finally:
+            os.close(fd)
+        return self.apply()
+    
+    def apply(self):
+        """Swap in a snapshot with any new job changes applied; returns the serving model"""
+        global recommender
+        with model_swap_lock:
+            recommender = model = recommender.with_job_changes()
+        
+        if (self.auto_compact and model.needs_compaction() and
+                time.time() - self.compaction_requested_at >= COMPACT_RETRY_SECONDS):
+            self.compaction_requested_at = time.time()
+            model_rebuilder.start(rebuild=True)
+        return model
+
 # Initialize the recommender system
 recommender = CareerPathRecommender()
+model_rebuilder = ModelRebuilder()
+# Registered after multiprocessing's own exit handler, so it runs first and
+# that handler doesn't wait for the build to finish
+atexit.register(model_rebuilder.stop)
+job_changes = JobChangeFeed()
+# Held while replacing the global recommender with a newer snapshot
+model_swap_lock = threading.Lock()
+
+# Request counts by (endpoint, status) and request latency by endpoint
+request_counts = Counter()
+request_counts_lock = threading.Lock()
+request_latency = {}
+
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def record_request_metrics(response):
+    if request.path.startswith('/api/') and request.path != '/api/metrics':
+        # Label by route pattern (e.g. /api/jobs/<job_id>), not the raw path, so
+        # the number of series stays fixed whatever paths clients request
+        endpoint = request.url_rule.rule if request.url_rule is not None else 'unmatched'
+        with request_counts_lock:
+            request_counts[(endpoint, response.status_code)] += 1
+        started = g.get('request_started')
+        if started is not None:
+            request_latency.setdefault(endpoint, _Histogram()).observe(time.perf_counter() - started)
+    return response
 
 @app.route('/api/initialize', methods=['POST'])
 def initialize_system():
-    """Initialize the recommendation system"""
+    """Rebuild the recommendation model in the background"""
     try:
-        if recommender.load_and_preprocess_data() and recommender.build_recommendation_models():
-            return jsonify({'success': True, 'message': 'System initialized successfully'})
+        started = model_rebuilder.start()
+        if started:
+            message = 'Model rebuild started'
+        elif model_rebuilder.snapshot()['state'] == 'building':
+            message = 'Model rebuild already in progress'
         else:
-            return jsonify({'success': False, 'message': 'Failed to initialize system'}), 500
+            message = 'Model is up to date'
+        return jsonify({
+            'success': True,
+            'message': message,
+            'status': model_rebuilder.snapshot()
+        }), 202
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/initialize/status', methods=['GET'])
+def initialize_status():
+    """Report background rebuild progress and the model currently serving"""
+    model = recommender
+    return jsonify({
+        'success': True,
+        'rebuild': model_rebuilder.snapshot(),
+        'model': {
+            'corpus_size': model.n_jobs,
+            'built_at': model.model_built_at,
+            'loaded_at': model.model_loaded_at,
+            'load_stats': model.load_stats,
+            'pending_job_changes': model.pending_job_changes,
+            'collaborative_users': len(model.user_factor_rows),
+            'collaborative_trained_at': model.als_trained_at
+        }
+    })
+
 @app.route('/api/skill-categories', methods=['GET'])
 def get_skill_categories():
     """Get available skill categories"""
@@ -481,52 +2617,412 @@ def get_skill_categories():
         'barriers': ['transport', 'childcare', 'language', 'disability', 'none']
     })
 
+def prepare_user_profile(user_profile):
+    """Validate a user profile and fill in defaults; returns an error message or None"""
+    if not isinstance(user_profile, dict):
+        return 'Profile must be a JSON object'
+    
+    # Validate required fields
+    required_fields = ['name', 'age', 'location', 'education', 'primary_interest', 'experience_years']
+    for field in required_fields:
+        if field not in user_profile:
+            return f'Missing required field: {field}'
+    for field in ('age', 'experience_years'):
+        value = user_profile[field]
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value < float('inf'):
+            return f'{field} must be a non-negative number'
+    
+    # Process barriers - ensure it's a list
+    if 'barriers' not in user_profile:
+        user_profile['barriers'] = []
+    elif isinstance(user_profile['barriers'], str):
+        user_profile['barriers'] = [b.strip() for b in user_profile['barriers'].split(',') if b.strip()]
+    if not (isinstance(user_profile['barriers'], list) and all(isinstance(b, str) for b in user_profile['barriers'])):
+        return 'barriers must be a list of strings'
+    
+    # Set defaults for optional fields
+    user_profile.setdefault('gender', 'not_specified')
+    user_profile.setdefault('aptitude_areas', '')
+    user_profile.setdefault('career_goal', 'stable job')
+    user_profile.setdefault('preferred_work_type', 'any')
+    
+    # Optional id of the user in the server, for personalized collaborative scores
+    if user_profile.get('user_id') is not None:
+        if not isinstance(user_profile['user_id'], (str, int)):
+            return 'user_id must be a string'
+        user_profile['user_id'] = str(user_profile['user_id'])
+    
+    # Optional hard filter: only jobs within this many km of the user's location
+    if user_profile.get('max_distance_km') is not None:
+        try:
+            user_profile['max_distance_km'] = float(user_profile['max_distance_km'])
+        except (TypeError, ValueError):
+            return 'max_distance_km must be a number'
+        if not user_profile['max_distance_km'] > 0:
+            return 'max_distance_km must be positive'
+        if recommender.gazetteer.geocode(str(user_profile['location'])) is None:
+            return (f"max_distance_km needs a location in the gazetteer; {user_profile['location']} "
+                    f"is not in {os.path.basename(GAZETTEER_PATH)}")
+    
+    # Optional hard filters: {feature: value or [values]}; a job must match
+    # one of the values of every feature given
+    filters = user_profile.get('filters')
+    if filters is not None:
+        if not isinstance(filters, dict):
+            return 'filters must be an object mapping a job feature to allowed values'
+        for feature, values in filters.items():
+            if feature in RANGE_FILTERS:
+                if not all(name in recommender.job_attributes for name in RANGE_FILTERS[feature]):
+                    return f'filters.{feature} needs a job corpus with {feature} data (a jobs export)'
+                if (not isinstance(values, dict) or not values or set(values) - {'min', 'max'} or
+                        not all(isinstance(v, (int, float)) for v in values.values())):
+                    return f'filters.{feature} must be an object with a numeric min and/or max'
+                continue
+            if feature not in FILTER_FEATURES:
+                expected = ', '.join(FILTER_FEATURES + tuple(RANGE_FILTERS))
+                return f"Unknown filter: {feature} (expected one of {expected})"
+            values = [values] if isinstance(values, str) else values
+            known = recommender.feature_encoders[feature].classes_.tolist()
+            if not isinstance(values, list) or not values or not all(v in known for v in values):
+                return f"filters.{feature} must be one or more of {', '.join(known)}"
+            filters[feature] = sorted(values)
+    return None
+
 @app.route('/api/recommend', methods=['POST'])
 def get_recommendations():
     """Get career path recommendations"""
     try:
         user_profile = request.json
         
-        # Validate required fields
-        required_fields = ['name', 'age', 'location', 'education', 'primary_interest', 'experience_years']
-        for field in required_fields:
-            if field not in user_profile:
-                return jsonify({'success': False, 'message': f'Missing required field: {field}'}), 400
+        error = prepare_user_profile(user_profile)
+        if error:
+            return jsonify({'success': False, 'message': error}), 400
         
-        # Process barriers - ensure it's a list
-        if 'barriers' not in user_profile:
-            user_profile['barriers'] = []
-        elif isinstance(user_profile['barriers'], str):
-            user_profile['barriers'] = [b.strip() for b in user_profile['barriers'].split(',') if b.strip()]
+        # Generate recommendations, already serialized
+        recommendations = recommender.recommend_career_path(user_profile, serialized=True)
         
-        # Set defaults for optional fields
-        user_profile.setdefault('gender', 'not_specified')
-        user_profile.setdefault('aptitude_areas', '')
-        user_profile.setdefault('career_goal', 'stable job')
-        user_profile.setdefault('preferred_work_type', 'any')
+        return _json_response(b'{"success":true,"user_profile":', _dumps(user_profile),
+                              b',"recommendations":', recommendations, b'}')
         
-        # Generate recommendations
-        recommendations = recommender.recommend_career_path(user_profile)
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/recommend/batch', methods=['POST'])
+def get_batch_recommendations():
+    """Get career path recommendations for a batch of profiles"""
+    try:
+        payload = request.get_json(silent=True)
+        if not isinstance(payload, dict):
+            return jsonify({'success': False, 'message': 'Request body must be a JSON object'}), 400
+        user_profiles = payload.get('profiles')
         
-        return jsonify({
-            'success': True,
-            'user_profile': user_profile,
-            'recommendations': recommendations
-        })
+        if not isinstance(user_profiles, list) or not user_profiles:
+            return jsonify({'success': False, 'message': 'profiles must be a non-empty list'}), 400
+        if len(user_profiles) > MAX_BATCH_PROFILES:
+            return jsonify({'success': False, 'message': f'At most {MAX_BATCH_PROFILES} profiles per batch'}), 400
+        
+        # Optional: recommend the top_k best jobs per profile instead of the usual three local and two elsewhere
+        top_k = payload.get('top_k')
+        if top_k is not None and (isinstance(top_k, bool) or not isinstance(top_k, int) or
+                                  not 0 < top_k <= MAX_BATCH_TOP_K):
+            return jsonify({'success': False, 'message': f'top_k must be an integer from 1 to {MAX_BATCH_TOP_K}'}), 400
+        
+        for i, user_profile in enumerate(user_profiles):
+            error = prepare_user_profile(user_profile)
+            if error:
+                return jsonify({'success': False, 'message': f'Profile {i}: {error}'}), 400
+        
+        results = recommender.recommend_career_paths(user_profiles, top_k=top_k, serialized=True)
+        
+        return _json_response(b'{"success":true,"results":[', b','.join(
+            b'{"user_profile":%s,"recommendations":%s}' % (_dumps(user_profile), recommendations)
+            for user_profile, recommendations in zip(user_profiles, results)
+        ), b']}')
+        
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+def _check_jobs_token():
+    """An error response unless the request carries the job change token, else None"""
+    token = os.environ.get(JOBS_TOKEN_ENV)
+    if not token:
+        return jsonify({'success': False, 'message': 'Job changes over the API are disabled; '
+                                                     'append them to the job change file'}), 403
+    supplied = request.headers.get('Authorization', '').encode('utf-8')
+    if not hmac.compare_digest(supplied, f'Bearer {token}'.encode('utf-8')):
+        return jsonify({'success': False, 'message': 'Missing or invalid job change token'}), 401
+    return None
+
+@app.route('/api/jobs', methods=['POST'])
+def upsert_job():
+    """Add or update a job from its jobs collection document; closed or draft jobs are removed"""
+    error = _check_jobs_token()
+    if error:
+        return error
+    try:
+        job = request.get_json(silent=True)
+        if not isinstance(job, dict) or _document_id(job) is None:
+            return jsonify({'success': False, 'message': 'Job must be a JSON object with an _id'}), 400
+        # Checked before the job reaches the change file, which every process replays
+        error = _job_document_error(job)
+        if error:
+            return jsonify({'success': False, 'message': error}), 400
+        if job.get('status', 'active') == 'active' and not job.get('title'):
+            return jsonify({'success': False, 'message': 'Active jobs need a title'}), 400
+        
+        model = job_changes.record(job)
+        return jsonify({'success': True, 'job_id': _document_id(job), 'corpus_size': model.n_live_jobs})
         
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)}), 500
 
+@app.route('/api/jobs/<job_id>', methods=['DELETE'])
+def remove_job(job_id):
+    """Stop recommending a job"""
+    error = _check_jobs_token()
+    if error:
+        return error
+    try:
+        model = job_changes.record({'_id': job_id, 'deleted': True})
+        return jsonify({'success': True, 'job_id': job_id, 'corpus_size': model.n_live_jobs})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    """Recommender metrics in Prometheus text format"""
+    model = recommender
+    lines = []
+    
+    def histograms(name, help_text, label, by_label):
+        lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} histogram'])
+        for value, histogram in sorted(by_label.items()):
+            lines.extend(histogram.render(name, f'{label}="{value}"'))
+        
+        lines.extend([f'# HELP {name}_quantile {help_text} (estimated quantiles)',
+                      f'# TYPE {name}_quantile gauge'])
+        for value, histogram in sorted(by_label.items()):
+            for q in (0.5, 0.95, 0.99):
+                lines.append(f'{name}_quantile{{{label}="{value}",quantile="{q}"}} {histogram.quantile(q)}')
+    
+    def gauge(name, help_text, value):
+        if value is not None:
+            lines.extend([f'# HELP {name} {help_text}', f'# TYPE {name} gauge', f'{name} {value}'])
+    
+    histograms('car_stage_latency_seconds', 'Latency of each recommendation stage',
+               'stage', model.stage_latency)
+    histograms('car_load_phase_seconds', 'Duration of each model load/build phase',
+               'phase', model.phase_latency)
+    histograms('car_request_latency_seconds', 'Latency of API requests',
+               'endpoint', request_latency)
+    histograms('car_pipeline_candidates', 'Candidates kept by each ranking pipeline stage',
+               'stage', model.pipeline_kept)
+    
+    lines.extend(['# HELP car_requests_total API requests by endpoint and status',
+                  '# TYPE car_requests_total counter'])
+    with request_counts_lock:
+        counts = sorted(request_counts.items())
+    for (endpoint, status), count in counts:
+        lines.append(f'car_requests_total{{endpoint="{endpoint}",status="{status}"}} {count}')
+    
+    cache = model.score_cache
+    with cache.lock:
+        cache_stats = dict(cache.stats)
+    for event, help_text in [('hits', 'Recommendations served from a cached shortlist'),
+                             ('misses', 'Recommendations that had to be scored'),
+                             ('expired', 'Cached shortlists dropped after their TTL'),
+                             ('evictions', 'Cached shortlists evicted to stay within the size bound'),
+                             ('invalidations', 'Times the cache was emptied for a new model version')]:
+        lines.extend([f'# HELP car_score_cache_{event}_total {help_text}',
+                      f'# TYPE car_score_cache_{event}_total counter',
+                      f'car_score_cache_{event}_total {cache_stats.get(event, 0)}'])
+    gauge('car_score_cache_entries', 'Cached shortlists currently held', len(cache))
+    
+    gauge('car_corpus_jobs', 'Number of jobs in the loaded corpus', model.n_live_jobs)
+    gauge('car_pending_job_changes', 'Jobs appended or removed since the artifact was built',
+          model.pending_job_changes)
+    gauge('car_model_build_timestamp_seconds', 'When the loaded model artifact was built',
+          model.model_built_at)
+    gauge('car_model_load_timestamp_seconds', 'When the model was last loaded',
+          model.model_loaded_at)
+    
+    return Response('\n'.join(lines) + '\n', mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
     return jsonify({'status': 'healthy', 'message': 'Career Recommendation API is running'})
 
+def _serve_worker(listener_fd, host, port, parent_pid, index, status_file):
+    """Serve requests on an inherited listening socket until told to stop"""
+    global model_swap_lock
+    for signum in (signal.SIGHUP, signal.SIGUSR1, signal.SIGUSR2):
+        signal.signal(signum, signal.SIG_IGN)
+    # The parent's rebuild thread may have held these when it forked
+    model_swap_lock = threading.Lock()
+    model_rebuilder.lock = threading.Lock()
+    # Rebuilds run once, in the parent, which then replaces every worker
+    model_rebuilder.delegate = lambda rebuild: os.kill(parent_pid, signal.SIGUSR2 if rebuild else signal.SIGUSR1)
+    model_rebuilder.status_file = status_file
+    # Every worker follows the job change file; only the first compacts it
+    job_changes.auto_compact = index == 0
+    job_changes.start()
+    
+    server = make_server(host, port, app, threaded=True, fd=listener_fd)
+    # Let in-flight requests finish when shutting down
+    server.daemon_threads = False
+    signal.signal(signal.SIGTERM, lambda *_: threading.Thread(target=server.shutdown).start())
+    server.serve_forever()
+    server.server_close()
+
+def serve_prefork(host, port, workers):
+    """Serve the API from pre-forked workers that share one read-only model.
+    
+    The model is loaded once, here, before forking. Its arrays are memory-mapped
+    from the artifact, so all workers read the same physical pages, and the
+    remaining Python objects are frozen out of the garbage collector so they
+    stay copy-on-write shared. SIGHUP reloads the model and replaces the workers.
+    
+    Rebuilds asked for by any worker (SIGUSR1, or SIGUSR2 to compact the job
+    change file) run here, one at a time, and the workers are replaced once
+    the rebuilt model is loaded. Request metrics stay per worker.
+    """
+    global recommender
+    listener = socket.create_server((host, port))
+    parent_pid = os.getpid()
+    status_file = recommender.artifact_dir + '.rebuild.json'
+    reload_requested = threading.Event()
+    stop_requested = threading.Event()
+    build_requested = threading.Event()
+    compaction_requested = threading.Event()
+    model_ready = threading.Event()
+    signal.signal(signal.SIGHUP, lambda *_: reload_requested.set())
+    signal.signal(signal.SIGTERM, lambda *_: stop_requested.set())
+    signal.signal(signal.SIGINT, lambda *_: stop_requested.set())
+    signal.signal(signal.SIGUSR1, lambda *_: build_requested.set())
+    signal.signal(signal.SIGUSR2, lambda *_: compaction_requested.set())
+    model_rebuilder.on_ready = model_ready.set
+    model_rebuilder.status_file = status_file
+    
+    def start_worker(index):
+        pid = os.fork()
+        if pid == 0:
+            try:
+                _serve_worker(listener.fileno(), host, port, parent_pid, index, status_file)
+            finally:
+                os._exit(0)
+        return pid
+    
+    def replace_workers(pids):
+        gc.freeze()
+        new_pids = {start_worker(index): index for index in range(workers)}
+        for pid in pids:
+            os.kill(pid, signal.SIGTERM)
+        retired.update(pids)
+        return new_pids
+    
+    # Replaced workers still finishing their requests
+    retired = set()
+    
+    model_rebuilder.publish()
+    published = model_rebuilder.snapshot()
+    gc.freeze()
+    # Worker process ids, mapped to the worker's index
+    pids = {start_worker(index): index for index in range(workers)}
+    print(f"Serving on {host}:{port} with {workers} workers")
+    
+    while not stop_requested.is_set():
+        if reload_requested.is_set():
+            reload_requested.clear()
+            candidate = CareerPathRecommender(recommender.csv_file, recommender.artifact_dir,
+                                              recommender.content_engine, recommender.pipeline)
+            if candidate.load_and_preprocess_data() and candidate.build_recommendation_models():
+                recommender = candidate
+                pids = replace_workers(pids)
+                print(f"Reloaded model with {recommender.n_jobs} jobs")
+        
+        if build_requested.is_set() or compaction_requested.is_set():
+            rebuild = compaction_requested.is_set()
+            build_requested.clear()
+            compaction_requested.clear()
+            model_rebuilder.start(rebuild)
+            # Overwrite the building status the requesting worker wrote
+            published = None
+        if model_ready.is_set():
+            # The rebuild already swapped the new model in here
+            model_ready.clear()
+            pids = replace_workers(pids)
+            print(f"Rebuilt model with {recommender.n_jobs} jobs")
+        # Workers answer status requests from this file
+        status = model_rebuilder.snapshot()
+        if status != published:
+            model_rebuilder.publish()
+            published = status
+        
+        # Reap exited workers, replacing any that died unexpectedly. Only
+        # workers are waited for; the build process is multiprocessing's to reap
+        for pid in list(pids) + list(retired):
+            if os.waitpid(pid, os.WNOHANG)[0] == 0:
+                continue
+            if pid in retired:
+                retired.discard(pid)
+            else:
+                index = pids.pop(pid)
+                pids[start_worker(index)] = index
+        time.sleep(0.2)
+    
+    model_rebuilder.stop()
+    for pid in pids:
+        os.kill(pid, signal.SIGTERM)
+    for pid in list(pids) + list(retired):
+        os.waitpid(pid, 0)
+
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Career Recommendation API')
+    parser.add_argument('--build', action='store_true',
+                        help='build the model artifact for the job CSV and exit')
+    parser.add_argument('--jobs', default='job_descriptions.csv',
+                        help='job corpus: CSV, or Parquet/Arrow IPC (.parquet, .arrow) with pyarrow')
+    parser.add_argument('--export-corpus', metavar='PATH',
+                        help='write the job CSV as a normalized .parquet or .arrow corpus and exit')
+    parser.add_argument('--content-engine', choices=CONTENT_ENGINES, default='tfidf',
+                        help='content scorer: sparse TF-IDF cosine or dense LSA embeddings')
+    parser.add_argument('--pipeline-config',
+                        help='JSON file overriding ranking pipeline stage sizes and weights')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='pre-forked worker processes sharing one model (POSIX only)')
+    args = parser.parse_args()
+    if args.workers > 1 and not hasattr(os, 'fork'):
+        parser.error('--workers requires a platform with fork()')
+    try:
+        pipeline = load_pipeline_config(args.pipeline_config)
+    except (OSError, ValueError) as e:
+        parser.error(f'invalid --pipeline-config: {e}')
+    recommender = CareerPathRecommender(args.jobs, content_engine=args.content_engine, pipeline=pipeline)
+    
+    if args.export_corpus:
+        try:
+            rows = recommender.export_corpus(args.export_corpus)
+        except (ImportError, ValueError) as e:
+            parser.error(str(e))
+        print(f"Exported {rows} jobs to {args.export_corpus}")
+        sys.exit(0)
+    
     # Initialize the system on startup
     if recommender.load_and_preprocess_data() and recommender.build_recommendation_models():
         print("✅ Career Recommendation System initialized successfully")
+        for phase, stats in recommender.load_stats.items():
+            print(f"   {phase}: {stats['seconds']}s, peak RSS {stats['peak_rss_mb']} MB")
     else:
         print("❌ Failed to initialize system")
     
-    app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
+    if args.build:
+        pass
+    elif args.workers > 1:
+        serve_prefork('0.0.0.0', 5000, args.workers)
+    else:
+        # The debug reloader runs this module in a watching parent too; only
+        # the serving child follows the change file
+        if os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+            job_changes.start()
+        app.run(debug=True, host='0.0.0.0', port=5000)
\ No newline at end of file
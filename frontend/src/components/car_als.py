@@ -0,0 +1,162 @@
+"""Train the collaborative model of the career recommender from application history.
+
+Applications are read from an export of the jobs collection (each job
+document carries its applicants) or from a flat CSV/JSONL file with one
+application per row (user_id, job_id and optionally status). They become an
+implicit-feedback user x job matrix, weighted by how far each application
+got, which alternating least squares factorizes (Hu, Koren & Volinsky, 2008).
+
+The float32 user and job factors are written next to the job corpus, where
+car.py picks them up: a user with application history is then scored against
+every job with one dot product. Users without history keep the profile-based
+collaborative score.
+
+    python car_als.py jobs.jsonl --jobs jobs.jsonl --factors 32 --iterations 15
+"""
+import argparse
+import csv
+import json
+import os
+import shutil
+import time
+
+import numpy as np
+import scipy.sparse as sp
+
+# Interaction strength by application status; a rejection is weaker evidence of fit
+STATUS_WEIGHTS = {'pending': 1.0, 'reviewed': 2.0, 'interview': 4.0, 'shortlisted': 4.0,
+                  'hired': 8.0, 'rejected': 0.5}
+
+
+def _plain_id(value):
+    """An id from an export, unwrapping extended JSON such as {"$oid": "..."}"""
+    if isinstance(value, dict):
+        value = next(iter(value.values()), None)
+    return None if value is None else str(value)
+
+
+def read_applications(path):
+    """Yield (user id, job id, status) for every application in an export"""
+    extension = os.path.splitext(path)[1].lower()
+    with open(path, newline='', encoding='utf-8') as f:
+        if extension == '.csv':
+            for record in csv.DictReader(f):
+                yield (record.get('user_id') or record.get('userId'), record.get('job_id') or record.get('jobId'),
+                       record.get('status') or 'pending')
+            return
+
+        records = json.load(f) if extension == '.json' else (json.loads(line) for line in f if line.strip())
+        for record in records:
+            if 'applicants' in record:
+                # A jobs collection document with its embedded applications
+                job_id = _plain_id(record.get('_id', record.get('id')))
+                for applicant in record['applicants'] or []:
+                    yield _plain_id(applicant.get('userId')), job_id, applicant.get('status', 'pending')
+            else:
+                yield (_plain_id(record.get('userId', record.get('user_id'))),
+                       _plain_id(record.get('jobId', record.get('job_id'))), record.get('status', 'pending'))
+
+
+def interaction_matrix(applications):
+    """Sparse user x job matrix of interaction strengths, with the user and job ids of its rows and columns"""
+    strengths = {}
+    for user_id, job_id, status in applications:
+        if user_id and job_id:
+            # Repeated applications count once, at their furthest status
+            key = (user_id, job_id)
+            strengths[key] = max(strengths.get(key, 0.0), STATUS_WEIGHTS.get(status, 1.0))
+    if not strengths:
+        raise ValueError('No applications found')
+
+    user_ids, users = np.unique([user for user, _ in strengths], return_inverse=True)
+    job_ids, jobs = np.unique([job for _, job in strengths], return_inverse=True)
+    matrix = sp.csr_matrix((np.fromiter(strengths.values(), dtype=np.float64, count=len(strengths)),
+                            (users, jobs)), shape=(len(user_ids), len(job_ids)))
+    return matrix, user_ids, job_ids
+
+
+def _least_squares(interactions, fixed, regularization, alpha):
+    """Solve every row's factors given the other side's fixed factors.
+
+    For a row with observed columns I and confidences c = 1 + alpha * r, the
+    factors minimize sum_j c_j (p_j - x.y_j)^2 + regularization * |x|^2 with
+    p = 1 on I and 0 elsewhere; the unobserved columns share the Y^T Y term.
+    """
+    n_factors = fixed.shape[1]
+    gram = fixed.T @ fixed + regularization * np.eye(n_factors)
+    factors = np.zeros((interactions.shape[0], n_factors))
+    for row in range(interactions.shape[0]):
+        start, end = interactions.indptr[row], interactions.indptr[row + 1]
+        if start == end:
+            continue
+        observed = fixed[interactions.indices[start:end]]
+        confidence = 1.0 + alpha * interactions.data[start:end]
+        a = gram + observed.T @ ((confidence - 1.0)[:, np.newaxis] * observed)
+        factors[row] = np.linalg.solve(a, observed.T @ confidence)
+    return factors
+
+
+def train(matrix, n_factors=32, iterations=15, regularization=0.1, alpha=40.0, seed=42):
+    """Implicit-feedback ALS; returns float32 user and job factors"""
+    rng = np.random.default_rng(seed)
+    user_factors = rng.normal(scale=0.01, size=(matrix.shape[0], n_factors))
+    job_factors = rng.normal(scale=0.01, size=(matrix.shape[1], n_factors))
+    by_job = matrix.T.tocsr()
+
+    for iteration in range(iterations):
+        started = time.perf_counter()
+        user_factors = _least_squares(matrix, job_factors, regularization, alpha)
+        job_factors = _least_squares(by_job, user_factors, regularization, alpha)
+        print(f"Iteration {iteration + 1}/{iterations}: {time.perf_counter() - started:.2f}s")
+
+    return user_factors.astype(np.float32), job_factors.astype(np.float32)
+
+
+def save_factors(output_dir, user_factors, job_factors, user_ids, job_ids, meta):
+    """Write the factors where car.py looks for them, replacing any previous ones in one step"""
+    tmp_dir = output_dir + '.tmp'
+    shutil.rmtree(tmp_dir, ignore_errors=True)
+    os.makedirs(tmp_dir)
+    for name, array in [('user_factors', user_factors), ('job_factors', job_factors),
+                        ('user_ids', user_ids.astype(str)), ('job_ids', job_ids.astype(str))]:
+        np.save(os.path.join(tmp_dir, f'{name}.npy'), np.ascontiguousarray(array))
+    with open(os.path.join(tmp_dir, 'meta.json'), 'w') as f:
+        json.dump(meta, f)
+
+    shutil.rmtree(output_dir, ignore_errors=True)
+    os.replace(tmp_dir, output_dir)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Train the collaborative model from application history')
+    parser.add_argument('applications', help='jobs collection export (JSON/JSONL) or applications CSV/JSONL')
+    parser.add_argument('--jobs', default='job_descriptions.csv',
+                        help='job corpus the recommender serves; the factors are written next to it')
+    parser.add_argument('--output', help='factor directory (default: <jobs corpus name>_als)')
+    parser.add_argument('--factors', type=int, default=32, help='latent factors per user and job')
+    parser.add_argument('--iterations', type=int, default=15, help='ALS sweeps')
+    parser.add_argument('--regularization', type=float, default=0.1, help='L2 penalty on the factors')
+    parser.add_argument('--alpha', type=float, default=40.0, help='confidence gained per unit of interaction')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    matrix, user_ids, job_ids = interaction_matrix(read_applications(args.applications))
+    print(f"{matrix.nnz} applications from {len(user_ids)} users to {len(job_ids)} jobs")
+
+    user_factors, job_factors = train(matrix, args.factors, args.iterations, args.regularization,
+                                      args.alpha, args.seed)
+    output_dir = args.output or os.path.splitext(args.jobs)[0] + '_als'
+    save_factors(output_dir, user_factors, job_factors, user_ids, job_ids, {
+        'factors': args.factors,
+        'iterations': args.iterations,
+        'regularization': args.regularization,
+        'alpha': args.alpha,
+        'status_weights': STATUS_WEIGHTS,
+        'applications': int(matrix.nnz),
+        'trained_at': time.time()
+    })
+    print(f"Factors written to {output_dir}")
+
+
+if __name__ == '__main__':
+    main()
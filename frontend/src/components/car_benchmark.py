@@ -0,0 +1,245 @@
+"""Benchmark the career recommender across synthetic job corpora of growing size.
+
+For each corpus size a synthetic CSV is generated and, in a fresh process
+(so peak memory is per size), the benchmark measures the load/preprocess
+phases, TF-IDF fit, artifact size, warm start from the artifact, peak RSS
+and single and concurrent /api/recommend latency through the Flask test
+client, both uncached (score cache disabled) and with every request a cache
+hit. Results are written as JSON so runs can be compared across commits.
+
+    python car_benchmark.py --sizes 1000 10000 100000 --output bench.json
+"""
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import platform
+import random
+import shutil
+import subprocess
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import numpy as np
+
+ROLES = {
+    'Software Developer': ['python', 'javascript', 'react', 'sql', 'git', 'coding', 'software development'],
+    'Data Analyst': ['excel', 'sql', 'python', 'data analysis', 'statistics', 'power bi'],
+    'Customer Support Executive': ['communication', 'customer service', 'crm', 'hindi', 'basic english'],
+    'Graphic Designer': ['photoshop', 'illustrator', 'creative design', 'graphics', 'canva'],
+    'Sales Representative': ['sales', 'negotiation', 'communication', 'lead generation'],
+    'Content Writer': ['writing', 'research', 'seo', 'content', 'editing'],
+    'Teaching Assistant': ['teaching', 'communication', 'training', 'subject knowledge'],
+    'Delivery Executive': ['driving', 'time management', 'delivery', 'navigation'],
+    'Healthcare Assistant': ['patient care', 'medical knowledge', 'nursing', 'first aid'],
+    'Electrician': ['electrical', 'wiring', 'repair', 'safety'],
+    'Accountant': ['accounting', 'tally', 'gst', 'finance', 'excel'],
+    'Retail Associate': ['retail', 'billing', 'customer service', 'inventory'],
+    'Machine Operator': ['manufacturing', 'production', 'mechanical', 'quality checks'],
+    'Security Guard': ['security', 'surveillance', 'discipline'],
+    'Digital Marketing Specialist': ['social media', 'seo', 'analytics', 'marketing', 'digital'],
+}
+LOCATIONS = [
+    'Mumbai', 'Delhi', 'Bangalore', 'Chennai', 'Kolkata', 'Pune', 'Hyderabad', 'Ahmedabad',
+    'Jaipur', 'Lucknow', 'Nagpur', 'Indore', 'Bhopal', 'Patna', 'Surat', 'Kochi', 'Coimbatore',
+    'Nashik', 'Thane', 'Navi Mumbai', 'Noida', 'Gurgaon', 'Vadodara', 'Visakhapatnam', 'Remote'
+]
+WORK_PHRASES = ['remote position', 'work from home', 'onsite role', 'hybrid schedule',
+                'flexible hours available', 'full_time', 'part_time shifts', 'local candidates preferred']
+EXPERIENCE_PHRASES = ['freshers welcome', 'entry level', '2-3 years experience',
+                      'intermediate level', 'senior role', '5+ years experience']
+EDUCATION_PHRASES = ['10th pass can apply', '12th pass required', 'diploma holders',
+                     'graduate degree required', 'postgraduate preferred']
+INCLUSION_PHRASES = ['women_friendly workplace', 'disability_friendly office', 'inclusive team',
+                     'local_language speakers', 'accessible building']
+
+
+def generate_corpus(path, n_rows, seed=42):
+    """Write a synthetic job CSV with realistic titles, skills, locations and text"""
+    rng = random.Random(seed)
+    roles = list(ROLES)
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Job Title', 'Location', 'Skills', 'Job Description'])
+        for _ in range(n_rows):
+            role = rng.choice(roles)
+            skills = rng.sample(ROLES[role], k=min(len(ROLES[role]), rng.randint(2, 4)))
+            description = ' '.join([
+                f"We are hiring a {role.lower()} to work with our team.",
+                f"Key skills: {', '.join(skills)}.",
+                rng.choice(WORK_PHRASES) + ',',
+                rng.choice(EXPERIENCE_PHRASES) + ',',
+                rng.choice(EDUCATION_PHRASES) + '.',
+                rng.choice(INCLUSION_PHRASES) if rng.random() < 0.3 else ''
+            ]).strip()
+            writer.writerow([role, rng.choice(LOCATIONS), ', '.join(skills), description])
+
+
+def generate_profiles(n_profiles, seed=7):
+    """Synthetic user profiles in the /api/recommend request format"""
+    rng = random.Random(seed)
+    interests = ['technical', 'creative', 'communication', 'manual', 'analytical',
+                 'healthcare', 'education', 'service']
+    education = ['below_10th', '10th_pass', '12th_pass', 'diploma', 'graduate', 'postgraduate']
+    barriers = ['transport', 'childcare', 'language', 'disability']
+    goals = ['stable job', 'software developer', 'teacher', 'nurse', 'sales manager', 'accountant']
+    return [{
+        'name': f'user{i}',
+        'age': rng.randint(18, 45),
+        'location': rng.choice(LOCATIONS),
+        'education': rng.choice(education),
+        'primary_interest': rng.choice(interests),
+        'experience_years': rng.randint(0, 10),
+        'barriers': rng.sample(barriers, k=rng.randint(0, 2)),
+        'aptitude_areas': ' '.join(rng.sample(ROLES[rng.choice(list(ROLES))], k=2)),
+        'career_goal': rng.choice(goals),
+        'preferred_work_type': rng.choice(['any', 'remote', 'onsite', 'hybrid'])
+    } for i in range(n_profiles)]
+
+
+def _percentiles(latencies):
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        'p50_ms': float(np.percentile(latencies_ms, 50)),
+        'p95_ms': float(np.percentile(latencies_ms, 95)),
+        'p99_ms': float(np.percentile(latencies_ms, 99)),
+        'mean_ms': float(latencies_ms.mean())
+    }
+
+
+def _timed_requests(client, profiles):
+    latencies = []
+    for profile in profiles:
+        started = time.perf_counter()
+        response = client.post('/api/recommend', json=profile)
+        latencies.append(time.perf_counter() - started)
+        if response.status_code != 200:
+            raise RuntimeError(f"/api/recommend failed: {response.get_json()}")
+    return latencies
+
+
+def _concurrent_run(profiles, concurrency):
+    """Latency and throughput of the profiles' requests spread over concurrent threads"""
+    import car
+
+    per_thread = [profiles[i::concurrency] for i in range(concurrency)]
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = [lat for batch in pool.map(
+            lambda chunk: _timed_requests(car.app.test_client(), chunk), per_thread) for lat in batch]
+    elapsed = time.perf_counter() - started
+    return dict(_percentiles(latencies), concurrency=concurrency, throughput_rps=len(latencies) / elapsed)
+
+
+def _directory_size(path):
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(path) for name in names)
+
+
+def benchmark_size(csv_path, n_requests, concurrency):
+    """Benchmark one corpus; runs in its own process so peak RSS is per corpus"""
+    import car
+
+    result = {}
+    recommender = car.CareerPathRecommender(csv_path)
+
+    started = time.perf_counter()
+    # Always build from scratch, even if a kept workdir already has this corpus's artifact
+    if not (recommender.load_and_preprocess_data(rebuild=True) and recommender.build_recommendation_models()):
+        raise RuntimeError(f"Failed to build the model for {csv_path}")
+    result['cold_start_seconds'] = time.perf_counter() - started
+    result['cold_start_phases'] = recommender.load_stats
+    result['load_preprocess_seconds'] = sum(recommender.load_stats[phase]['seconds']
+                                            for phase in ('read_csv', 'extract_features', 'encode_features'))
+    result['tfidf_fit_seconds'] = recommender.load_stats['fit_models']['seconds']
+    result['corpus_size'] = recommender.n_jobs
+    result['vocabulary_size'] = len(recommender.tfidf.vocabulary_)
+    result['artifact_bytes'] = _directory_size(recommender.artifact_dir)
+
+    recommender = car.CareerPathRecommender(csv_path)
+    started = time.perf_counter()
+    recommender.load_and_preprocess_data()
+    recommender.build_recommendation_models()
+    result['warm_start_seconds'] = time.perf_counter() - started
+    car.recommender = recommender
+
+    # Uncached runs score every request: the score cache keeps nothing. Warm-up
+    # uses its own profiles so no measured profile has been seen before
+    profiles = generate_profiles(n_requests)
+    client = car.app.test_client()
+    recommender.score_cache = car._ScoreCache(max_entries=0)
+    _timed_requests(client, generate_profiles(min(10, n_requests), seed=1))  # warm up
+    result['single'] = _percentiles(_timed_requests(client, profiles))
+    result['concurrent'] = _concurrent_run(profiles, concurrency)
+
+    # Cached runs replay profiles whose shortlists are already in the cache
+    recommender.score_cache = car._ScoreCache()
+    _timed_requests(client, profiles)
+    result['single_cached'] = _percentiles(_timed_requests(client, profiles))
+    result['concurrent_cached'] = _concurrent_run(profiles, concurrency)
+    result['score_cache'] = dict(recommender.score_cache.stats)
+
+    result['peak_rss_mb'] = car._peak_rss_mb()
+    return result
+
+
+def _git_commit():
+    try:
+        return subprocess.check_output(['git', 'rev-parse', 'HEAD'], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the career recommender')
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000, 1000000],
+                        help='corpus sizes (rows) to benchmark')
+    parser.add_argument('--requests', type=int, default=200, help='requests per latency run')
+    parser.add_argument('--concurrency', type=int, default=8, help='threads for the concurrent run')
+    parser.add_argument('--output', default='car_benchmark.json', help='JSON results file')
+    parser.add_argument('--workdir', help='where to write corpora (default: a temp dir)')
+    parser.add_argument('--keep', action='store_true', help='keep generated corpora and artifacts')
+    args = parser.parse_args()
+
+    workdir = args.workdir or tempfile.mkdtemp(prefix='car_bench_')
+    os.makedirs(workdir, exist_ok=True)
+    report = {
+        'commit': _git_commit(),
+        'timestamp': time.time(),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'cpu_count': os.cpu_count(),
+        'requests': args.requests,
+        'results': []
+    }
+
+    try:
+        for size in args.sizes:
+            csv_path = os.path.join(workdir, f'jobs_{size}.csv')
+            started = time.perf_counter()
+            generate_corpus(csv_path, size)
+            print(f"Generated {size} jobs in {time.perf_counter() - started:.1f}s")
+
+            # A fresh process per corpus keeps peak RSS measurements independent
+            with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                result = pool.submit(benchmark_size, csv_path, args.requests, args.concurrency).result()
+            result['csv_bytes'] = os.path.getsize(csv_path)
+            report['results'].append(result)
+            print(f"  cold {result['cold_start_seconds']:.2f}s, warm {result['warm_start_seconds']:.2f}s, "
+                  f"p50 {result['single']['p50_ms']:.2f}ms, p99 {result['single']['p99_ms']:.2f}ms "
+                  f"(cached p50 {result['single_cached']['p50_ms']:.2f}ms), "
+                  f"peak RSS {result['peak_rss_mb']} MB")
+    finally:
+        if not args.keep:
+            shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
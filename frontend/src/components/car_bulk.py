@@ -0,0 +1,234 @@
+"""Recommend career paths for a whole file of profiles, offline.
+
+Profiles are streamed from CSV (one column per /api/recommend field, barriers
+comma-separated) or JSONL (one /api/recommend request body per line). They
+are handed out in batches across a process pool, and each profile is ranked
+exactly as /api/recommend ranks it. Each worker memory-maps the same model
+artifact, so the model sits in memory once however many workers run. Results
+are written as each batch finishes, in input order, to JSONL (one record per
+profile: its row plus the fields of its /api/recommend response) or Parquet. At most a few batches
+per worker are in flight, so memory stays flat however long the input is.
+
+    python car_bulk.py beneficiaries.csv recommendations.jsonl --workers 8
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # Parquet output is optional
+    pa = pq = None
+
+import car
+
+# Batches queued per worker; bounds memory while keeping workers busy
+BATCHES_PER_WORKER = 2
+# CSV columns holding numbers
+NUMERIC_FIELDS = ('age', 'experience_years', 'max_distance_km')
+PARQUET_SCHEMA = None if pa is None else pa.schema([
+    ('row', pa.int64()),
+    ('success', pa.bool_()),
+    ('message', pa.string()),
+    ('user_profile', pa.string()),
+    ('recommendations', pa.string())
+])
+
+
+def read_profiles(path, input_format):
+    """Yield (row number, profile) pairs from a CSV or JSONL file, one at a time"""
+    with open(path, newline='', encoding='utf-8') as f:
+        if input_format == 'jsonl':
+            for row, line in enumerate(f):
+                if line.strip():
+                    try:
+                        yield row, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield row, f'Invalid JSON: {e}'
+            return
+
+        for row, record in enumerate(csv.DictReader(f)):
+            # Empty cells mean "not given", so the API defaults apply
+            profile = {key.strip(): value.strip() for key, value in record.items()
+                       if key and value is not None and value.strip()}
+            for field in NUMERIC_FIELDS:
+                if field in profile:
+                    try:
+                        profile[field] = float(profile[field])
+                    except ValueError:
+                        pass
+            if 'filters' in profile:
+                try:
+                    profile['filters'] = json.loads(profile['filters'])
+                except json.JSONDecodeError:
+                    pass
+            yield row, profile
+
+
+def _load_worker_model(csv_file, content_engine, pipeline):
+    """Process pool initializer: memory-map the model artifact built by the parent"""
+    car.recommender = car.CareerPathRecommender(csv_file, content_engine=content_engine, pipeline=pipeline)
+    if not (car.recommender.load_and_preprocess_data() and car.recommender.build_recommendation_models()):
+        raise RuntimeError('Failed to load the recommendation model')
+
+
+def recommend_batch(batch, top_k):
+    """Recommendations for a batch of (row, profile) pairs, as /api/recommend responses"""
+    results = {}
+    valid = []
+    for row, profile in batch:
+        error = profile if isinstance(profile, str) else car.prepare_user_profile(profile)
+        if error:
+            results[row] = {'row': row, 'success': False, 'message': error}
+        else:
+            valid.append((row, profile))
+
+    if valid:
+        profiles = [profile for _, profile in valid]
+        try:
+            batch_recommendations = car.recommender.recommend_career_paths(profiles, top_k=top_k)
+        except Exception:
+            # Rank one at a time, so a profile that can't be ranked fails alone
+            batch_recommendations = None
+        for position, (row, profile) in enumerate(valid):
+            try:
+                recommendations = (batch_recommendations[position] if batch_recommendations is not None else
+                                   car.recommender.recommend_career_path(profile, top_k=top_k))
+            except Exception as e:
+                results[row] = {'row': row, 'success': False, 'message': f'Failed to rank profile: {e}'}
+                continue
+            results[row] = {'row': row, 'success': True, 'user_profile': profile,
+                            'recommendations': recommendations}
+    return [results[row] for row, _ in batch]
+
+
+class _JsonlWriter:
+    def __init__(self, path):
+        self.file = open(path, 'w', encoding='utf-8')
+
+    def write(self, records):
+        for record in records:
+            self.file.write(json.dumps(record, ensure_ascii=False) + '\n')
+
+    def close(self):
+        self.file.close()
+
+
+class _ParquetWriter:
+    """One row group per batch; nested fields are stored as JSON strings"""
+    def __init__(self, path):
+        self.writer = pq.ParquetWriter(path, PARQUET_SCHEMA)
+
+    def write(self, records):
+        def as_json(record, field):
+            return json.dumps(record[field], ensure_ascii=False) if field in record else None
+
+        self.writer.write_table(pa.table({
+            'row': [record['row'] for record in records],
+            'success': [record['success'] for record in records],
+            'message': [record.get('message') for record in records],
+            'user_profile': [as_json(record, 'user_profile') for record in records],
+            'recommendations': [as_json(record, 'recommendations') for record in records]
+        }, schema=PARQUET_SCHEMA))
+
+    def close(self):
+        self.writer.close()
+
+
+def _batches(profiles, batch_size):
+    batch = []
+    for item in profiles:
+        batch.append(item)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def _format_from_path(path, formats):
+    extension = os.path.splitext(path)[1].lower().lstrip('.')
+    return extension if extension in formats else None
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Bulk career recommendations for a file of profiles')
+    parser.add_argument('input', help='profiles as CSV or JSONL')
+    parser.add_argument('output', help='results as JSONL or Parquet')
+    parser.add_argument('--input-format', choices=['csv', 'jsonl'], help='default: from the file extension')
+    parser.add_argument('--output-format', choices=['jsonl', 'parquet'], help='default: from the file extension')
+    parser.add_argument('--jobs', default='job_descriptions.csv', help='job corpus (CSV, Parquet or Arrow IPC)')
+    parser.add_argument('--content-engine', choices=car.CONTENT_ENGINES, default='tfidf')
+    parser.add_argument('--pipeline-config', help='JSON file overriding ranking pipeline settings')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='worker processes')
+    parser.add_argument('--batch-size', type=int, default=256, help='profiles per worker task')
+    parser.add_argument('--top-k', type=int,
+                        help='recommend the top k jobs per profile (default: three local and two elsewhere, '
+                             'as /api/recommend does)')
+    parser.add_argument('--progress-every', type=float, default=5.0, help='seconds between progress reports')
+    args = parser.parse_args()
+
+    input_format = args.input_format or _format_from_path(args.input, ('csv', 'jsonl')) or 'csv'
+    output_format = args.output_format or _format_from_path(args.output, ('jsonl', 'parquet')) or 'jsonl'
+    if args.top_k is not None and args.top_k <= 0:
+        parser.error('--top-k must be positive')
+    if output_format == 'parquet' and pq is None:
+        parser.error('Parquet output requires pyarrow (pip install pyarrow)')
+
+    # Build (or validate) the artifact once here; workers then only map it
+    pipeline = car.load_pipeline_config(args.pipeline_config)
+    model = car.CareerPathRecommender(args.jobs, content_engine=args.content_engine, pipeline=pipeline)
+    if not (model.load_and_preprocess_data() and model.build_recommendation_models()):
+        raise SystemExit('Failed to initialize the recommendation model')
+    print(f"Model ready: {model.n_jobs} jobs", file=sys.stderr)
+    del model
+
+    writer = _ParquetWriter(args.output) if output_format == 'parquet' else _JsonlWriter(args.output)
+    started = last_report = time.perf_counter()
+    done = failed = 0
+
+    def report(final=False):
+        elapsed = time.perf_counter() - started
+        rate = done / elapsed if elapsed else 0.0
+        label = 'Done' if final else 'Progress'
+        print(f"{label}: {done} profiles ({failed} failed) in {elapsed:.1f}s, {rate:.0f} profiles/s, "
+              f"peak RSS {car._peak_rss_mb()} MB", file=sys.stderr)
+
+    try:
+        with ProcessPoolExecutor(max_workers=args.workers, initializer=_load_worker_model,
+                                 initargs=(args.jobs, args.content_engine, pipeline)) as pool:
+            pending = deque()
+            batches = _batches(read_profiles(args.input, input_format), args.batch_size)
+
+            while True:
+                while len(pending) < args.workers * BATCHES_PER_WORKER:
+                    batch = next(batches, None)
+                    if batch is None:
+                        break
+                    pending.append(pool.submit(recommend_batch, batch, args.top_k))
+                if not pending:
+                    break
+
+                # Write in input order; later batches keep computing meanwhile
+                records = pending.popleft().result()
+                writer.write(records)
+                done += len(records)
+                failed += sum(not record['success'] for record in records)
+
+                if time.perf_counter() - last_report >= args.progress_every:
+                    report()
+                    last_report = time.perf_counter()
+    finally:
+        writer.close()
+
+    report(final=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,97 @@
+"""Compare the content scoring engines of the career recommender side by side.
+
+Each sampled job is used as a query (by default its skills), and an engine
+"recalls" the job when it ranks it within the top k. Latency is measured on
+candidate retrieval and content scoring, called as /api/recommend calls them,
+and reported for each of the two stages (TF-IDF scores come with retrieval).
+
+    python car_engine_eval.py --csv job_descriptions.csv --sample 500 --k 10
+"""
+import argparse
+import json
+import time
+
+import numpy as np
+
+from car import CONTENT_ENGINES, CareerPathRecommender
+
+
+def evaluate_engine(recommender, sample, k, query_field):
+    """Recall@k of self-retrieval and per-query latency for one engine"""
+    hits = 0
+    latencies = []
+    retrieve_latencies = []
+
+    for idx in sample:
+        profile = {
+            'primary_interest': recommender.job_columns[query_field][idx],
+            'aptitude_areas': '',
+            'career_goal': '',
+            'location': '',
+            'experience_years': 0,
+            'preferred_work_type': 'any',
+            'barriers': []
+        }
+
+        start = time.perf_counter()
+        candidates, scores = recommender._retrieve_candidates(profile)
+        retrieved = time.perf_counter()
+        if scores is None:
+            scores = recommender._content_based_recommendation(profile, candidates)
+        top = recommender._top_indices(scores, k)
+        if candidates is not None:
+            top = candidates[top]
+        latencies.append(time.perf_counter() - start)
+        retrieve_latencies.append(retrieved - start)
+
+        hits += int(idx in top)
+
+    latencies_ms = np.array(latencies) * 1000
+    retrieve_ms = np.array(retrieve_latencies) * 1000
+    content_ms = latencies_ms - retrieve_ms
+    return {
+        'recall_at_k': hits / len(sample),
+        'latency_ms_p50': float(np.percentile(latencies_ms, 50)),
+        'latency_ms_p95': float(np.percentile(latencies_ms, 95)),
+        'latency_ms_p99': float(np.percentile(latencies_ms, 99)),
+        'retrieve_ms_p50': float(np.percentile(retrieve_ms, 50)),
+        'content_ms_p50': float(np.percentile(content_ms, 50))
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare recommender content engines')
+    parser.add_argument('--csv', default='job_descriptions.csv', help='job corpus CSV')
+    parser.add_argument('--sample', type=int, default=500, help='number of query jobs')
+    parser.add_argument('--k', type=int, default=10, help='cutoff for recall@k')
+    parser.add_argument('--query-field', default='skills', choices=['job_title', 'skills'],
+                        help='job field used as the query')
+    parser.add_argument('--seed', type=int, default=42)
+    args = parser.parse_args()
+
+    report = {'k': args.k, 'query_field': args.query_field, 'engines': {}}
+    sample = None
+
+    for engine in CONTENT_ENGINES:
+        recommender = CareerPathRecommender(args.csv, content_engine=engine)
+
+        start = time.perf_counter()
+        if not (recommender.load_and_preprocess_data() and recommender.build_recommendation_models()):
+            raise SystemExit(f"Failed to initialize the {engine} engine")
+        init_seconds = time.perf_counter() - start
+
+        if sample is None:
+            rng = np.random.default_rng(args.seed)
+            sample = rng.choice(recommender.n_jobs, size=min(args.sample, recommender.n_jobs), replace=False)
+            report['corpus_size'] = recommender.n_jobs
+            report['sample_size'] = len(sample)
+
+        result = evaluate_engine(recommender, sample, args.k, args.query_field)
+        result['init_seconds'] = init_seconds
+        report['engines'][engine] = result
+
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,214 @@
+"""Tests for the career recommender (car.py), run with python -m pytest from this directory"""
+import csv
+import json
+import os
+
+import pytest
+
+import car
+
+# Role: skills of a small job corpus; every role is posted in every city
+ROLES = {
+    'Software Developer': 'python, programming, computer, coding',
+    'Staff Nurse': 'nursing, patient care, first aid',
+    'Retail Associate': 'billing, retail, customer service, inventory',
+    'Delivery Driver': 'driving, delivery, navigation',
+    'Teacher': 'teaching, lesson planning, classroom',
+    'Electrician': 'electrical, wiring, repair',
+    'Accountant': 'accounting, tally, gst',
+    'Machine Operator': 'manufacturing, production, machining',
+}
+CITIES = ['Mumbai', 'Pune', 'Delhi', 'Chennai', 'Kolkata', 'Jaipur']
+
+
+def make_profile(**fields):
+    """A valid profile; fields override the defaults"""
+    profile = {
+        'name': 'Asha', 'age': 24, 'location': 'Pune', 'education': 'graduate',
+        'primary_interest': 'other', 'experience_years': 1, 'barriers': [],
+        'aptitude_areas': '', 'career_goal': '', 'preferred_work_type': 'any',
+    }
+    profile.update(fields)
+    assert car.prepare_user_profile(profile) is None
+    return profile
+
+
+def titles(recommendations):
+    return [job['job_title'] for job in recommendations['primary_recommendations']]
+
+
+@pytest.fixture
+def recommender(tmp_path, monkeypatch):
+    """A recommender built from the small corpus, serving as car.recommender"""
+    path = tmp_path / 'jobs.csv'
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Job Title', 'Location', 'Skills', 'Job Description'])
+        for city in CITIES:
+            for role, skills in ROLES.items():
+                writer.writerow([role, city, skills, f'We are hiring a {role.lower()}. Key skills: {skills}.'])
+    recommender = car.CareerPathRecommender(str(path))
+    assert recommender.load_and_preprocess_data() and recommender.build_recommendation_models()
+    monkeypatch.setattr(car, 'recommender', recommender)
+    return recommender
+
+
+@pytest.mark.parametrize('aptitude_areas, career_goal, expected', [
+    # Known words: matched through their English terms alone, whatever the English goal says
+    ('प्रोग्रामिंग कंप्यूटर', 'I want a stable job with good growth', 'software developer'),
+    ('संगणक प्रोग्रामिंग', 'working in a big company', 'software developer'),
+    # Unknown words: matched by spelling, not by suffixes shared with other skills
+    ('नर्सिंग', 'I want to help people', 'staff nurse'),
+    ('बिलिंग', 'looking for work', 'retail associate'),
+    ('ड्रायव्हिंग', 'मला नोकरी हवी आहे', 'delivery driver'),
+    ('वायरिंग', 'काम चाहिए', 'electrician'),
+])
+def test_regional_language_queries(recommender, aptitude_areas, career_goal, expected):
+    profile = make_profile(aptitude_areas=aptitude_areas, career_goal=career_goal)
+    assert set(titles(recommender.recommend_career_path(profile, top_k=3))) == {expected}
+
+
+def test_regional_words_spelled_like_job_words(recommender):
+    # English words and words of the term table are left to TF-IDF; Marathi filler
+    # words are spelled like no job word closely enough to stand in for one
+    assert recommender._spelled_like(['नर्सिंग', 'ड्रायव्हिंग', 'मला', 'नोकरी', 'हवी']) == ['nursing', 'driving']
+    query = recommender._user_query(make_profile(aptitude_areas='प्रोग्रामिंग कंप्यूटर', career_goal='good growth'))
+    assert query == 'other प्रोग्रामिंग कंप्यूटर good growth programming coding computer'
+
+
+# Role: (skills, work mode, monthly salary range) of a small jobs collection export
+EXPORT_ROLES = {
+    'Staff Nurse': (['nursing', 'patient care'], 'onsite', (20000, 30000)),
+    'Software Developer': (['python', 'coding'], 'remote', (40000, 60000)),
+    'Retail Associate': (['billing', 'retail'], 'onsite', (12000, 18000)),
+    'Teacher': (['teaching', 'classroom'], 'hybrid', (25000, 35000)),
+}
+EXPORT_CITIES = ['Pune', 'Mumbai', 'Delhi', 'Chennai', 'Kolkata']
+
+
+def job_document(job_id, title, location='Pune', skills=('nursing', 'patient care'), work_mode='onsite',
+                 salary=(20000, 30000), **fields):
+    """A jobs collection document; fields override the defaults"""
+    document = {
+        '_id': {'$oid': job_id}, 'title': title, 'description': f'{title} needed', 'location': location,
+        'jobType': 'full-time', 'workMode': work_mode, 'skills': list(skills),
+        'salary': {'min': salary[0], 'max': salary[1], 'currency': 'INR'}, 'experience': {'min': 0, 'max': 5},
+        'category': 'other', 'status': 'active',
+    }
+    document.update(fields)
+    return document
+
+
+@pytest.fixture
+def export_recommender(tmp_path, monkeypatch):
+    """A recommender built from a small jobs export, serving as car.recommender, with
+    job changes enabled over the API and compaction off"""
+    path = tmp_path / 'jobs.jsonl'
+    with open(path, 'w', encoding='utf-8') as f:
+        for city in EXPORT_CITIES:
+            for role, (skills, work_mode, salary) in EXPORT_ROLES.items():
+                for copy in range(2):
+                    job_id = f'{role}-{city}-{copy}'.lower().replace(' ', '-')
+                    f.write(json.dumps(job_document(job_id, role, city, skills, work_mode, salary)) + '\n')
+    recommender = car.CareerPathRecommender(str(path))
+    assert recommender.load_and_preprocess_data() and recommender.build_recommendation_models()
+    monkeypatch.setattr(car, 'recommender', recommender)
+    monkeypatch.setattr(car.job_changes, 'auto_compact', False)
+    monkeypatch.setenv(car.JOBS_TOKEN_ENV, 'secret')
+    return recommender
+
+
+@pytest.fixture
+def client(export_recommender):
+    return car.app.test_client()
+
+
+def post_job(client, document):
+    return client.post('/api/jobs', json=document, headers={'Authorization': 'Bearer secret'})
+
+
+def delete_job(client, job_id):
+    return client.delete(f'/api/jobs/{job_id}', headers={'Authorization': 'Bearer secret'})
+
+
+def recommended_titles(**fields):
+    """Titles of the top 40 jobs the serving model recommends for a nursing profile"""
+    profile = make_profile(aptitude_areas='nursing patient care', career_goal='nurse', **fields)
+    return titles(car.recommender.recommend_career_path(profile, top_k=40))
+
+
+def test_appended_replaced_and_removed_jobs(client, export_recommender):
+    n_jobs = export_recommender.n_live_jobs
+    
+    response = post_job(client, job_document('n1', 'Night Shift Nurse'))
+    assert response.status_code == 200 and response.get_json()['corpus_size'] == n_jobs + 1
+    assert 'night shift nurse' in recommended_titles()
+    
+    # Posting the same _id again replaces the job
+    assert post_job(client, job_document('n1', 'Day Shift Nurse')).get_json()['corpus_size'] == n_jobs + 1
+    assert 'day shift nurse' in recommended_titles()
+    assert 'night shift nurse' not in recommended_titles()
+    
+    # Deleted and closed jobs are no longer recommended, appended or from the export
+    assert delete_job(client, 'n1').get_json()['corpus_size'] == n_jobs
+    closed = job_document('staff-nurse-pune-0', 'Staff Nurse', status='closed')
+    assert post_job(client, closed).get_json()['corpus_size'] == n_jobs - 1
+    pune_nurses = [job for job in car.recommender.recommend_career_path(
+        make_profile(aptitude_areas='nursing', career_goal='nurse'), top_k=40)['primary_recommendations']
+        if job['job_title'] == 'staff nurse' and job['location'] == 'pune']
+    assert 'day shift nurse' not in recommended_titles()
+    assert len(pune_nurses) == 1
+
+
+def test_filters_and_distance_cover_appended_jobs(client):
+    post_job(client, job_document('r1', 'Remote Nurse Coordinator', work_mode='remote', salary=(90000, 100000)))
+    post_job(client, job_document('m1', 'Harbour Clinic Nurse', location='Mumbai'))
+    
+    filtered = recommended_titles(filters={'work_type': ['remote'], 'salary': {'min': 80000}})
+    assert filtered == ['remote nurse coordinator']
+    
+    # Mumbai is about 120 km from Pune
+    nearby = recommended_titles(max_distance_km=50)
+    assert 'remote nurse coordinator' in nearby and 'harbour clinic nurse' not in nearby
+    assert 'harbour clinic nurse' in recommended_titles(location='Mumbai', max_distance_km=50)
+
+
+def test_score_cache_emptied_when_job_changes_apply(client, export_recommender):
+    profile = make_profile(aptitude_areas='nursing', career_goal='nurse')
+    assert client.post('/api/recommend', json=profile).status_code == 200
+    assert client.post('/api/recommend', json=profile).status_code == 200
+    cache = export_recommender.score_cache
+    assert (cache.stats['misses'], cache.stats['hits'], len(cache)) == (1, 1, 1)
+    
+    post_job(client, job_document('n1', 'Night Shift Nurse'))
+    assert car.recommender.changes_offset > export_recommender.changes_offset
+    assert car.recommender.score_cache is cache
+    recommendations = client.post('/api/recommend', json=profile).get_json()['recommendations']
+    assert (cache.stats['invalidations'], cache.stats['misses'], len(cache)) == (1, 2, 1)
+    assert 'night shift nurse' in titles(recommendations)
+
+
+def test_poisoned_job_documents_are_skipped(client, export_recommender):
+    changes_file = export_recommender.changes_file
+    for document in [job_document('p1', ['Nurse']), job_document('p2', 'Nurse', skills=[['nursing']]),
+                     dict(job_document('p3', 'Nurse'), salary='lots')]:
+        response = post_job(client, document)
+        assert response.status_code == 400 and not response.get_json()['success']
+    assert not os.path.exists(changes_file)
+    
+    # Lines written to the change file directly aren't checked by the API
+    with open(changes_file, 'w', encoding='utf-8') as f:
+        f.write(json.dumps(job_document('p4', 'Poisoned Nurse', experience=[0, 5])) + '\n')
+        f.write('{"_id": "p5", "title": \n')
+        f.write(json.dumps(job_document('n1', 'Night Shift Nurse')) + '\n')
+    n_jobs = export_recommender.n_live_jobs
+    
+    # Applied while serving, after a restart and when compacted into a rebuilt artifact
+    assert car.job_changes.apply().n_live_jobs == n_jobs + 1
+    assert 'night shift nurse' in recommended_titles()
+    for rebuild in (False, True):
+        restarted = car.CareerPathRecommender(export_recommender.csv_file)
+        assert restarted.load_and_preprocess_data(rebuild) and restarted.build_recommendation_models()
+        assert restarted.n_live_jobs == n_jobs + 1
+        car.recommender = restarted
+        assert 'night shift nurse' in recommended_titles()